@@ -1,7 +1,26 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from api.routes import resume, history
+from api.services.llm import get_llm_stats, get_analysis_cache_stats
+from api.services.parser import (
+    shutdown_parse_pool,
+    get_parse_cache_stats,
+    get_parse_pool_stats,
+    UPLOAD_MAX_REQUEST_MB,
+)
+from api.services.auth import close_http_client, get_auth_cache_stats
+from api.services.supabase import close_postgrest_client
+from api.services.exporter import get_export_cache_stats, get_export_pool_stats, shutdown_export_pool
+from api.services.metrics import request_seconds, render_metrics, server_timing, start_request
+from api.services.warmup import start_prewarm
+from api.services.jobs import job_queue, get_job_stats
+import json
+import logging
 import os
+import time
+
+timing_logger = logging.getLogger("api.timing")
 
 app = FastAPI(
     title="Resume ATS Optimizer API",
@@ -25,16 +44,90 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # The frontend reads export ETags to send If-None-Match on the next export
+    expose_headers=["ETag"],
 )
 
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """Refuse oversized uploads from Content-Length, before the body is read."""
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > UPLOAD_MAX_REQUEST_MB * 1024 * 1024:
+        return JSONResponse(
+            status_code=413,
+            content={"detail": f"Request body is larger than the {UPLOAD_MAX_REQUEST_MB:g} MB limit."},
+        )
+    return await call_next(request)
+
+def _route_label(request: Request) -> str:
+    """Route template (not the raw path) so ids don't explode metric cardinality."""
+    endpoint = request.scope.get("endpoint")
+    for route in app.routes:
+        if getattr(route, "endpoint", None) is endpoint:
+            return route.path
+    return "unmatched"
+
+
+@app.middleware("http")
+async def record_timings(request: Request, call_next):
+    """Per-stage timings as a Server-Timing header, a structured log line and histograms."""
+    timings = start_request()
+    started = time.perf_counter()
+    response = await call_next(request)
+    total = time.perf_counter() - started
+
+    route = _route_label(request)
+    request_seconds.observe(total, request.method, route, response.status_code)
+    header = server_timing(timings, total)
+    existing = response.headers.get("Server-Timing")
+    response.headers["Server-Timing"] = f"{existing}, {header}" if existing else header
+    timing_logger.info(json.dumps({
+        "method": request.method,
+        "route": route,
+        "status": response.status_code,
+        "total_ms": round(total * 1000, 1),
+        "stages_ms": {stage: round(seconds * 1000, 1) for stage, seconds in timings.items()},
+    }))
+    return response
+
 # Include routes
 app.include_router(resume.router)
 app.include_router(history.router)
 
+@app.on_event("startup")
+async def startup():
+    # Optionally load heavy SDKs in the background so first requests don't pay for them
+    start_prewarm()
+    # Pick up background jobs a previous process queued or was running
+    job_queue.resume()
+
+@app.on_event("shutdown")
+async def shutdown():
+    shutdown_parse_pool()
+    shutdown_export_pool()
+    await close_http_client()
+    await close_postgrest_client()
+
+
 @app.get("/")
 async def root():
     return {"status": "ok", "message": "Resume ATS Optimizer API"}
 
 @app.get("/api/health")
 async def health():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "llm": get_llm_stats(),
+        "analysis_cache": get_analysis_cache_stats(),
+        "parse_cache": get_parse_cache_stats(),
+        "auth_cache": get_auth_cache_stats(),
+        "export_cache": get_export_cache_stats(),
+        "parse_pool": get_parse_pool_stats(),
+        "export_pool": get_export_pool_stats(),
+        "jobs": get_job_stats(),
+    }
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus scrape endpoint: stage latencies, token counts, cache and queue gauges."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
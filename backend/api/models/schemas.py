@@ -45,6 +45,22 @@ class HistoryItem(BaseModel):
     created_at: datetime
 
 
+class HistorySummary(BaseModel):
+    id: str
+    job_title: Optional[str] = None
+    ats_score: int
+    source_type: Optional[str] = "docx"
+    matched_keywords: List[str] = []
+    matched_count: int = 0
+    missing_count: int = 0
+    created_at: datetime
+
+
+class HistoryPage(BaseModel):
+    items: List[HistorySummary]
+    next_cursor: Optional[str] = None
+
+
 class KeywordApplyRequest(BaseModel):
     resume_html: str
     keywords: List[str]
@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi import APIRouter, Depends, HTTPException, Query
 from api.routes.auth import get_current_user
-from api.services.supabase import get_supabase_client
-from api.models.schemas import HistoryItem, HistoryCreate
-from typing import List
+from api.services import history_store
+from api.models.schemas import HistoryItem, HistoryCreate, HistoryPage
+from typing import List, Optional
 import os
 
 router = APIRouter(prefix="/api/history", tags=["history"])
@@ -13,12 +13,11 @@ async def debug_check_connection():
     """Diagnostic endpoint to check Supabase connection."""
     url = os.getenv("SUPABASE_URL", "not set")
     try:
-        supabase = get_supabase_client()
-        response = supabase.table("history").select("count", count="exact").limit(1).execute()
+        total = await history_store.count_history()
         return {
             "status": "connected",
             "table_exists": True,
-            "total_records": response.count,
+            "total_records": total,
             "supabase_url": f"{url[:15]}..." if url else "not set"
         }
     except Exception as e:
@@ -37,19 +36,27 @@ async def debug_check_connection():
 async def list_history(user: dict = Depends(get_current_user)):
     """List all history entries for the current user."""
     try:
-        print(f"DEBUG: Fetching history for user {user['id']}")
-        supabase = get_supabase_client()
-        response = (
-            supabase.table("history")
-            .select("*")
-            .eq("user_id", user["id"])
-            .order("created_at", desc=True)
-            .execute()
-        )
-        print(f"DEBUG: Found {len(response.data)} records")
-        return response.data
+        return await history_store.list_history(user["id"])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch history: {str(e)}")
+
+
+@router.get("/summary", response_model=HistoryPage)
+async def list_history_summary(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    user: dict = Depends(get_current_user),
+):
+    """
+    Paginated history list with summary columns only.
+    Pass the returned next_cursor to fetch the following page.
+    """
+    try:
+        items, next_cursor = await history_store.list_history_summaries(user["id"], limit, cursor)
+        return {"items": items, "next_cursor": next_cursor}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"DEBUG: History fetch FAILED: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch history: {str(e)}")
 
 
@@ -57,21 +64,11 @@ async def list_history(user: dict = Depends(get_current_user)):
 async def create_history(entry: HistoryCreate, user: dict = Depends(get_current_user)):
     """Save a new history entry."""
     try:
-        supabase = get_supabase_client()
-        data = entry.model_dump()
-        data["user_id"] = user["id"]
-
-        print(f"DEBUG: Saving history entry for user {user['id']}")
-        print(f"DEBUG: Data keys: {list(data.keys())}")
-
-        response = supabase.table("history").insert(data).execute()
-        
-        if not response.data:
-            print("DEBUG: History insert returned no data")
-            
-        return response.data[0] if response.data else {"status": "created"}
+        row = await history_store.create_history(user["id"], entry.model_dump())
+        return row if row else {"status": "created"}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"DEBUG: History save FAILED: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to save history: {str(e)}")
 
 
@@ -79,16 +76,7 @@ async def create_history(entry: HistoryCreate, user: dict = Depends(get_current_
 async def get_history(history_id: str, user: dict = Depends(get_current_user)):
     """Get a specific history entry."""
     try:
-        supabase = get_supabase_client()
-        response = (
-            supabase.table("history")
-            .select("*")
-            .eq("id", history_id)
-            .eq("user_id", user["id"])
-            .single()
-            .execute()
-        )
-        return response.data
+        return await history_store.get_history(user["id"], history_id)
     except Exception as e:
         raise HTTPException(
             status_code=404, detail=f"History entry not found: {str(e)}"
@@ -99,10 +87,7 @@ async def get_history(history_id: str, user: dict = Depends(get_current_user)):
 async def delete_history(history_id: str, user: dict = Depends(get_current_user)):
     """Delete a history entry."""
     try:
-        supabase = get_supabase_client()
-        supabase.table("history").delete().eq("id", history_id).eq(
-            "user_id", user["id"]
-        ).execute()
+        await history_store.delete_history(user["id"], history_id)
         return {"status": "deleted"}
     except Exception as e:
         raise HTTPException(
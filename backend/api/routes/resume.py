@@ -1,89 +1,403 @@
-from fastapi import APIRouter, UploadFile, File, Form, Response, HTTPException
-from api.services.parser import parse_file
-from api.services.llm import analyze_resume, suggest_keyword_placement
-from api.services.exporter import export_pdf, export_docx
+from fastapi import APIRouter, UploadFile, File, Form, Header, Response, HTTPException
+from typing import List, Optional
+from fastapi.responses import JSONResponse, StreamingResponse
+from api.services.cache import content_hash
+from api.services.parser import (
+    parse_content,
+    parse_file,
+    parse_upload,
+    spool_upload,
+    UploadTooLargeError,
+)
+from api.services.llm import (
+    analyze_resume,
+    suggest_keyword_placement,
+    stream_analyze_resume,
+    stream_keyword_placement,
+    LLMBusyError,
+    LLMTimeoutError,
+    LLMUnavailableError,
+    breaker,
+)
+from api.services.batch import analyze_batch
+from api.services.exporter import export_etag, render_export
+from api.services.html_diff import diff_html
+from api.services.jobs import job_queue, JobQueueFullError, FINISHED_STATES
+from api.services.workers import WorkerBusyError, WorkerTimeoutError
 from api.models.schemas import ExportRequest, KeywordApplyRequest
+import json
+import os
+
+# Seconds between keep-alive comments on an idle job event stream
+JOB_EVENTS_KEEPALIVE_SECONDS = float(os.getenv("JOB_EVENTS_KEEPALIVE_SECONDS", "15"))
 
 router = APIRouter(prefix="/api", tags=["resume"])
 
 
+def _http_error(e: Exception, prefix: str, value_error_status: int = 500) -> HTTPException:
+    """Map service-layer exceptions onto the HTTP error the client should see."""
+    if isinstance(e, HTTPException):
+        return e
+    if isinstance(e, (LLMBusyError, JobQueueFullError)):
+        return HTTPException(status_code=503, detail=str(e))
+    if isinstance(e, LLMUnavailableError):
+        return HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": str(breaker.retry_after())}
+        )
+    if isinstance(e, LLMTimeoutError):
+        return HTTPException(status_code=504, detail=str(e))
+    if isinstance(e, UploadTooLargeError):
+        return HTTPException(status_code=413, detail=str(e))
+    if isinstance(e, ValueError) and value_error_status != 500:
+        return HTTPException(status_code=value_error_status, detail=str(e))
+    return HTTPException(status_code=500, detail=f"{prefix}: {str(e)}")
+
+
+def _sse_event(event: str, data) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _sse_response(events) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _strip_fences(modified_html: str) -> str:
+    # Clean up any markdown fences from the response
+    if modified_html.startswith("```"):
+        lines = modified_html.split("\n")
+        modified_html = "\n".join(lines[1:-1])
+    return modified_html
+
+
+def _check_resume_text(resume_text: str):
+    if not resume_text.strip():
+        raise HTTPException(
+            status_code=400,
+            detail="Could not extract text from the uploaded file. Please ensure it contains readable text.",
+        )
+
+
 @router.post("/analyze")
 async def analyze(
     resume: UploadFile = File(...),
     job_description: str = Form(...),
+    bypass_cache: bool = Form(False),
+    mode: str = Form("llm"),
+    stream: bool = False,
+    job: bool = False,
 ):
-    """Upload resume + job description, get ATS analysis."""
+    """
+    Upload resume + job description, get ATS analysis.
+    mode is "llm" (default), "hybrid" (local keywords + LLM suggestions) or "fast" (local only).
+    With ?stream=true the response is an SSE stream of parsed/token/result events.
+    With ?job=true the analysis runs in the background; the 202 response
+    carries a job id for GET /api/jobs/{id} or its /events stream.
+    """
+    if job:
+        try:
+            with await spool_upload(resume) as upload:
+                content = upload.read()
+                payload = {
+                    "filename": upload.filename,
+                    "job_description": job_description,
+                    "mode": mode,
+                    "use_cache": not bypass_cache,
+                }
+                dedupe_key = None if bypass_cache else content_hash("analyze", upload.sha256, job_description, mode)
+            return _job_response(*job_queue.submit("analyze", payload, content, dedupe_key))
+        except Exception as e:
+            raise _http_error(e, "Analysis failed", value_error_status=400)
+
+    if stream:
+        # The upload is closed once this handler returns, so spool it before streaming.
+        try:
+            upload = await spool_upload(resume)
+        except Exception as e:
+            raise _http_error(e, "Analysis failed", value_error_status=400)
+        return _sse_response(_analyze_events(upload, job_description, bypass_cache, mode))
+
     try:
         # Parse the resume file
-        resume_text, resume_html, source_type = await parse_file(resume)
+        parsed = await parse_file(resume)
+        return await _analysis(parsed, job_description, not bypass_cache, mode)
+
+    except Exception as e:
+        raise _http_error(e, "Analysis failed", value_error_status=400)
+
+
+async def _analysis(parsed: tuple, job_description: str, use_cache: bool, mode: str) -> dict:
+    resume_text, resume_html, source_type = parsed
+    _check_resume_text(resume_text)
 
-        if not resume_text.strip():
-            raise HTTPException(
-                status_code=400,
-                detail="Could not extract text from the uploaded file. Please ensure it contains readable text.",
-            )
+    # Analyze with LLM
+    result = await analyze_resume(resume_text, job_description, use_cache=use_cache, mode=mode)
+    result["resume_text"] = resume_text
+    result["resume_html"] = resume_html
+    result["source_type"] = source_type
+    return result
+
+
+async def _analyze_job(payload: dict, upload: bytes) -> dict:
+    try:
+        parsed = await parse_content(upload, payload["filename"])
+        return await _analysis(parsed, payload["job_description"], payload["use_cache"], payload["mode"])
+    except Exception as e:
+        raise _http_error(e, "Analysis failed", value_error_status=400)
+
+
+async def _analyze_events(upload, job_description: str, bypass_cache: bool, mode: str):
+    try:
+        with upload:
+            resume_text, resume_html, source_type = await parse_upload(upload)
+        _check_resume_text(resume_text)
+        yield _sse_event("parsed", {"source_type": source_type, "characters": len(resume_text)})
+
+        result = None
+        async for kind, payload in stream_analyze_resume(
+            resume_text, job_description, use_cache=not bypass_cache, mode=mode
+        ):
+            if kind == "token":
+                yield _sse_event("token", {"text": payload})
+            else:
+                result = payload
 
-        # Analyze with LLM
-        result = await analyze_resume(resume_text, job_description)
         result["resume_text"] = resume_text
         result["resume_html"] = resume_html
         result["source_type"] = source_type
+        yield _sse_event("result", result)
+    except Exception as e:
+        error = _http_error(e, "Analysis failed", value_error_status=400)
+        yield _sse_event("error", {"status": error.status_code, "detail": error.detail})
+
+
+@router.post("/analyze/batch")
+async def analyze_many(
+    resumes: List[UploadFile] = File(...),
+    job_descriptions: List[str] = Form(...),
+    bypass_cache: bool = Form(False),
+    mode: str = Form("llm"),
+    stream: bool = False,
+):
+    """
+    Score every uploaded resume against every job description.
+    Returns per-pair results plus a ranked summary; with ?stream=true each
+    result is sent as an SSE item event as soon as it completes.
+    """
+    uploads = []
+    try:
+        for resume in resumes:
+            uploads.append(await spool_upload(resume))
+    except Exception as e:
+        for upload in uploads:
+            upload.close()
+        raise _http_error(e, "Batch analysis failed", value_error_status=400)
+    events = analyze_batch(uploads, job_descriptions, mode=mode, use_cache=not bypass_cache)
+
+    if stream:
+        return _sse_response(_batch_events(events, uploads))
+
+    try:
+        response = {"items": []}
+        async for kind, payload in events:
+            if kind == "item":
+                response["items"].append(payload)
+            else:
+                response[kind] = payload
+        return response
+    except Exception as e:
+        raise _http_error(e, "Batch analysis failed", value_error_status=400)
+    finally:
+        for upload in uploads:
+            upload.close()
 
-        return result
 
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+async def _batch_events(events, uploads: list):
+    try:
+        async for kind, payload in events:
+            yield _sse_event(kind, payload)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+        error = _http_error(e, "Batch analysis failed", value_error_status=400)
+        yield _sse_event("error", {"status": error.status_code, "detail": error.detail})
+    finally:
+        for upload in uploads:
+            upload.close()
+
+
+def _keywords_result(request: KeywordApplyRequest, modified_html: str, patch: bool) -> dict:
+    modified_html = _strip_fences(modified_html)
+    if patch:
+        return {"patch": diff_html(request.resume_html, modified_html)}
+    return {"modified_html": modified_html}
 
 
 @router.post("/apply-keywords")
-async def apply_keywords(request: KeywordApplyRequest):
-    """Apply confirmed keywords to resume using LLM."""
+async def apply_keywords(
+    request: KeywordApplyRequest, stream: bool = False, patch: bool = False, job: bool = False
+):
+    """
+    Apply confirmed keywords to resume using LLM.
+    With ?stream=true the rewritten HTML is streamed as SSE token events before the result.
+    With ?patch=true the result is a node-level patch against resume_html
+    instead of the whole modified document.
+    With ?job=true the rewrite runs in the background (see /api/analyze).
+    """
+    if job:
+        payload = {"request": request.model_dump(), "patch": patch}
+        dedupe_key = content_hash(
+            "apply-keywords", request.resume_html, json.dumps(request.keywords), request.source_type, patch
+        )
+        try:
+            return _job_response(*job_queue.submit("apply-keywords", payload, dedupe_key=dedupe_key))
+        except Exception as e:
+            raise _http_error(e, "Keyword application failed")
+
+    if stream:
+        return _sse_response(_apply_keywords_events(request, patch))
+
     try:
         modified_html = await suggest_keyword_placement(
             request.resume_html, request.keywords, request.source_type
         )
+        return _keywords_result(request, modified_html, patch)
+    except Exception as e:
+        raise _http_error(e, "Keyword application failed")
 
-        # Clean up any markdown fences from the response
-        if modified_html.startswith("```"):
-            lines = modified_html.split("\n")
-            modified_html = "\n".join(lines[1:-1])
 
-        return {"modified_html": modified_html}
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Keyword application failed: {str(e)}"
+async def _apply_keywords_job(payload: dict, upload: bytes) -> dict:
+    request = KeywordApplyRequest(**payload["request"])
+    try:
+        modified_html = await suggest_keyword_placement(
+            request.resume_html, request.keywords, request.source_type
         )
+        return _keywords_result(request, modified_html, payload["patch"])
+    except Exception as e:
+        raise _http_error(e, "Keyword application failed")
+
+
+async def _apply_keywords_events(request: KeywordApplyRequest, patch: bool = False):
+    try:
+        async for kind, payload in stream_keyword_placement(
+            request.resume_html, request.keywords, request.source_type
+        ):
+            if kind == "token":
+                yield _sse_event("token", {"text": payload})
+            elif kind == "section":
+                yield _sse_event("section", payload)
+            else:
+                yield _sse_event("result", _keywords_result(request, payload, patch))
+    except Exception as e:
+        error = _http_error(e, "Keyword application failed")
+        yield _sse_event("error", {"status": error.status_code, "detail": error.detail})
+
+
+job_queue.register("analyze", _analyze_job)
+job_queue.register("apply-keywords", _apply_keywords_job)
+
+
+def _job_response(job: dict, reused: bool) -> JSONResponse:
+    """202 with the job's current state and where to follow it."""
+    status_url = f"/api/jobs/{job['id']}"
+    return JSONResponse(
+        status_code=202,
+        content={**job, "reused": reused, "status_url": status_url, "events_url": f"{status_url}/events"},
+        headers={"Location": status_url},
+    )
+
+
+def _get_job(job_id: str) -> dict:
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Poll a background job: status is queued, running, succeeded or failed."""
+    return _get_job(job_id)
+
+
+@router.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """SSE stream of status events for a job, ending with its result or error event."""
+    _get_job(job_id)
+    return _sse_response(_job_events(job_id))
+
+
+async def _job_events(job_id: str):
+    status = None
+    while True:
+        job = job_queue.get(job_id)
+        if job is None:
+            yield _sse_event("error", {"status": 404, "detail": "Job not found or expired"})
+            return
+        if job["status"] != status:
+            status = job["status"]
+            yield _sse_event("status", {"id": job_id, "status": status})
+        if status in FINISHED_STATES:
+            if job["error"] is not None:
+                yield _sse_event("error", job["error"])
+            else:
+                yield _sse_event("result", job["result"])
+            return
+        if not await job_queue.wait(job_id, JOB_EVENTS_KEEPALIVE_SECONDS):
+            yield ": keep-alive\n\n"
+
+
+EXPORT_MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+async def _export_response(request: ExportRequest, fmt: str, if_none_match: Optional[str]) -> Response:
+    """Render (or reuse) an export; answers 304 when the client already has this version."""
+    etag = export_etag(request.html_content, fmt)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    # Queue and render times reach the Server-Timing header through the export pool
+    try:
+        content, etag = await render_export(request.html_content, fmt)
+    except WorkerBusyError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "2"})
+    except WorkerTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+    headers["Content-Disposition"] = f'attachment; filename="{request.filename}.{fmt}"'
+    return Response(content=content, media_type=EXPORT_MEDIA_TYPES[fmt], headers=headers)
 
 
 @router.post("/export/pdf")
-async def export_resume_pdf(request: ExportRequest):
+async def export_resume_pdf(request: ExportRequest, if_none_match: Optional[str] = Header(None)):
     """Export resume HTML as PDF."""
     try:
-        pdf_bytes = export_pdf(request.html_content)
-        return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f'attachment; filename="{request.filename}.pdf"'
-            },
-        )
+        return await _export_response(request, "pdf", if_none_match)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"PDF export failed: {str(e)}")
 
 
 @router.post("/export/docx")
-async def export_resume_docx(request: ExportRequest):
+async def export_resume_docx(request: ExportRequest, if_none_match: Optional[str] = Header(None)):
     """Export resume HTML as DOCX."""
     try:
-        docx_bytes = export_docx(request.html_content)
-        return Response(
-            content=docx_bytes,
-            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            headers={
-                "Content-Disposition": f'attachment; filename="{request.filename}.docx"'
-            },
-        )
+        return await _export_response(request, "docx", if_none_match)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"DOCX export failed: {str(e)}")
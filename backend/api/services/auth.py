@@ -0,0 +1,166 @@
+import hashlib
+import logging
+import os
+import time
+from typing import TYPE_CHECKING
+from jose import jwt, JWTError, ExpiredSignatureError
+from api.services.cache import LRUCache
+from api.services.metrics import register_stats
+
+# httpx is only needed for JWKS/remote verification, so it is imported on first use
+if TYPE_CHECKING:
+    import httpx
+
+
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "1024"))
+AUTH_TIMEOUT_SECONDS = float(os.getenv("AUTH_TIMEOUT_SECONDS", "5"))
+JWKS_TTL_SECONDS = float(os.getenv("JWKS_TTL_SECONDS", "600"))
+
+logger = logging.getLogger(__name__)
+
+_http_client = None
+_jwks = {"keys": {}, "fetched_at": 0.0}
+token_cache = LRUCache(AUTH_CACHE_SIZE)
+
+
+class AuthError(Exception):
+    """Raised when a token cannot be verified."""
+
+
+def get_http_client() -> "httpx.AsyncClient":
+    """Return the shared keep-alive client used for Supabase auth calls."""
+    global _http_client
+    import httpx
+
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=AUTH_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared auth client; called on application shutdown."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def get_auth_cache_stats() -> dict:
+    """Return hit/miss counters for the verified-token cache."""
+    return token_cache.stats()
+
+
+register_stats("auth_cache", get_auth_cache_stats)
+
+
+def _jwt_secret():
+    secret = os.getenv("SUPABASE_JWT_SECRET")
+    # Ignore the placeholder value shipped in .env
+    if secret and "your_" not in secret:
+        return secret
+    return None
+
+
+def _user_from_claims(claims: dict) -> dict:
+    return {"id": claims.get("sub"), "email": claims.get("email")}
+
+
+async def _signing_key(kid: str):
+    """Look up a JWKS key by kid, refetching the key set when stale or unknown."""
+    supabase_url = os.getenv("SUPABASE_URL")
+    if not supabase_url:
+        return None
+    age = time.time() - _jwks["fetched_at"]
+    # Unknown kids usually mean a key rotation, but don't let forged tokens
+    # trigger a refetch on every request.
+    if age > JWKS_TTL_SECONDS or (kid not in _jwks["keys"] and age > 30):
+        response = await get_http_client().get(f"{supabase_url}/auth/v1/.well-known/jwks.json")
+        response.raise_for_status()
+        _jwks["keys"] = {key.get("kid"): key for key in response.json().get("keys", [])}
+        _jwks["fetched_at"] = time.time()
+    return _jwks["keys"].get(kid)
+
+
+async def _verify_locally(token: str):
+    """Verify the token signature locally; returns None when that isn't possible."""
+    header = jwt.get_unverified_header(token)
+    algorithm = header.get("alg")
+
+    if algorithm == "HS256":
+        key = _jwt_secret()
+    elif algorithm in ("RS256", "ES256"):
+        import httpx
+
+        try:
+            key = await _signing_key(header.get("kid"))
+        except httpx.HTTPError as e:
+            logger.debug("JWKS fetch failed: %s", e)
+            key = None
+    else:
+        key = None
+    if key is None:
+        return None
+
+    return jwt.decode(token, key, algorithms=[algorithm], audience="authenticated")
+
+
+async def _verify_remotely(token: str) -> dict:
+    """Ask Supabase to verify the token via /auth/v1/user."""
+    supabase_url = os.getenv("SUPABASE_URL")
+    supabase_anon_key = os.getenv("SUPABASE_ANON_KEY")
+    if not supabase_url or not supabase_anon_key:
+        raise AuthError("Token verification failed (no valid method found)")
+
+    import httpx
+
+    try:
+        response = await get_http_client().get(
+            f"{supabase_url}/auth/v1/user",
+            headers={"Authorization": f"Bearer {token}", "apikey": supabase_anon_key},
+        )
+    except httpx.HTTPError as e:
+        raise AuthError(f"Token verification failed: {str(e)}")
+    if response.status_code != 200:
+        raise AuthError(f"Invalid token (API error {response.status_code})")
+
+    user_data = response.json()
+    # Standardization: Ensure we always return an 'id' and 'email'
+    return {"id": user_data.get("id") or user_data.get("sub"), "email": user_data.get("email")}
+
+
+async def verify_token(token: str) -> dict:
+    """
+    Verify a Supabase access token and return {"id", "email"}.
+    Tokens are checked locally (HS256 secret or cached JWKS) when possible and
+    fall back to Supabase's /auth/v1/user; verified tokens are cached until exp.
+    """
+    cache_key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    cached = token_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    try:
+        claims = jwt.get_unverified_claims(token)
+    except JWTError as e:
+        raise AuthError(f"Invalid token: {str(e)}")
+
+    try:
+        verified = await _verify_locally(token)
+    except ExpiredSignatureError as e:
+        raise AuthError(f"Invalid token: {str(e)}")
+    except JWTError as e:
+        if not (os.getenv("SUPABASE_URL") and os.getenv("SUPABASE_ANON_KEY")):
+            raise AuthError(f"Invalid token: {str(e)}")
+        # e.g. a rotated secret; let Supabase have the final word
+        logger.debug("Local JWT verification failed: %s", e)
+        verified = None
+
+    user = _user_from_claims(verified) if verified is not None else await _verify_remotely(token)
+
+    expires_in = claims.get("exp", 0) - time.time()
+    if expires_in > 0:
+        token_cache.set(cache_key, user, ttl=expires_in)
+    return user
@@ -0,0 +1,116 @@
+import asyncio
+import os
+from api.services.cache import content_hash
+from api.services.llm import analyze_resume, scheduler
+from api.services.parser import parse_upload
+
+
+BATCH_MAX_PAIRS = int(os.getenv("BATCH_MAX_PAIRS", "200"))
+
+
+async def analyze_batch(resumes: list, job_descriptions: list, mode: str = "llm", use_cache: bool = True):
+    """
+    Score every resume against every job description.
+    resumes is a list of SpooledUpload (see parser.spool_upload); the caller
+    closes them. Identical files and job
+    descriptions are parsed/analyzed once. Yields ("parsed", info), then one
+    ("item", result) per resume/job pair as analyses complete, then ("summary", ranking).
+    """
+    # Group duplicate inputs so each distinct one is parsed and analyzed once
+    file_groups = {}
+    for index, upload in enumerate(resumes):
+        extension = os.path.splitext((upload.filename or "").lower())[1]
+        key = f"{extension}:{upload.sha256}"
+        file_groups.setdefault(key, {"filename": upload.filename, "upload": upload, "indexes": []})
+        file_groups[key]["indexes"].append(index)
+
+    job_groups = {}
+    for index, job_description in enumerate(job_descriptions):
+        key = content_hash(job_description)
+        job_groups.setdefault(key, {"text": job_description, "indexes": []})
+        job_groups[key]["indexes"].append(index)
+
+    if len(file_groups) * len(job_groups) > BATCH_MAX_PAIRS:
+        raise ValueError(
+            f"Batch too large: {len(file_groups)} resumes x {len(job_groups)} job descriptions "
+            f"exceeds the limit of {BATCH_MAX_PAIRS} analyses."
+        )
+
+    file_keys = list(file_groups)
+    parsed = await asyncio.gather(
+        *(parse_upload(file_groups[key]["upload"]) for key in file_keys),
+        return_exceptions=True,
+    )
+
+    resume_info = [None] * len(resumes)
+    parsed_texts = {}
+    for key, outcome in zip(file_keys, parsed):
+        group = file_groups[key]
+        if isinstance(outcome, Exception):
+            info = {"filename": group["filename"], "error": str(outcome)}
+        elif not outcome[0].strip():
+            info = {"filename": group["filename"], "error": "Could not extract text from the uploaded file."}
+        else:
+            parsed_texts[key] = outcome[0]
+            info = {"filename": group["filename"], "source_type": outcome[2], "characters": len(outcome[0])}
+        for index in group["indexes"]:
+            resume_info[index] = dict(info, index=index, filename=resumes[index].filename)
+    yield "parsed", {"resumes": resume_info, "job_descriptions": len(job_descriptions)}
+
+    # Run at most max_concurrency analyses from this batch at once so a single
+    # batch cannot overflow the shared scheduler queue.
+    limit = asyncio.Semaphore(scheduler.max_concurrency)
+
+    async def run(file_key, job_key):
+        async with limit:
+            try:
+                result = await analyze_resume(
+                    parsed_texts[file_key], job_groups[job_key]["text"], use_cache=use_cache, mode=mode
+                )
+                return file_key, job_key, result, None
+            except Exception as e:
+                return file_key, job_key, None, str(e)
+
+    tasks = [
+        asyncio.ensure_future(run(file_key, job_key))
+        for file_key in parsed_texts
+        for job_key in job_groups
+    ]
+    items = []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            file_key, job_key, result, error = await next_done
+            for resume_index in file_groups[file_key]["indexes"]:
+                for job_index in job_groups[job_key]["indexes"]:
+                    item = {
+                        "resume_index": resume_index,
+                        "job_index": job_index,
+                        "filename": resumes[resume_index].filename,
+                    }
+                    if error:
+                        item["error"] = error
+                    else:
+                        item.update(result)
+                    items.append(item)
+                    yield "item", item
+    finally:
+        # The client went away or an error escaped: don't keep paying for LLM calls
+        for task in tasks:
+            task.cancel()
+
+    scored = [item for item in items if "error" not in item]
+    ranked = sorted(scored, key=lambda item: item["ats_score"], reverse=True)
+    yield "summary", {
+        "total": len(items),
+        "failed": len(items) - len(scored),
+        "ranked": [
+            {
+                "resume_index": item["resume_index"],
+                "job_index": item["job_index"],
+                "filename": item["filename"],
+                "job_title": item.get("job_title", ""),
+                "ats_score": item["ats_score"],
+            }
+            for item in ranked
+        ],
+    }
@@ -0,0 +1,184 @@
+import base64
+import gzip
+import hashlib
+import os
+from api.services.cache import LRUCache
+from api.services.supabase import execute
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+HISTORY_BLOB_STORAGE = os.getenv("HISTORY_BLOB_STORAGE", "false").lower() in ("1", "true", "yes")
+BLOB_MIN_BYTES = int(os.getenv("BLOB_MIN_BYTES", "512"))
+BLOB_CACHE_SIZE = int(os.getenv("BLOB_CACHE_SIZE", "256"))
+
+TABLE = "history_blobs"
+REF_PREFIX = "blob:sha256:"
+# History column listing the blobs store_bodies wrote for the row; only these are ever resolved
+HASHES_FIELD = "blob_hashes"
+# History columns large enough to be worth storing once and referencing
+BODY_FIELDS = ("resume_text", "resume_html", "final_resume_html", "job_description")
+
+blob_cache = LRUCache(BLOB_CACHE_SIZE)
+
+
+def _compress(data: bytes) -> tuple:
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=10).compress(data)
+    return "gzip", gzip.compress(data, compresslevel=6)
+
+
+def _decompress(encoding: str, data: bytes) -> bytes:
+    if encoding == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed history blobs")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if encoding == "gzip":
+        return gzip.decompress(data)
+    return data
+
+
+def is_ref(value) -> bool:
+    return isinstance(value, str) and value.startswith(REF_PREFIX)
+
+
+def check_bodies(row: dict):
+    """Refuse body fields that look like blob references; raises ValueError."""
+    for field in BODY_FIELDS:
+        if is_ref(row.get(field)):
+            raise ValueError(f"{field} must not start with {REF_PREFIX!r}")
+
+
+def _row_digests(row: dict) -> set:
+    """Digests of the row's references that store_bodies wrote itself."""
+    trusted = set(row.get(HASHES_FIELD) or ())
+    return {
+        row[field][len(REF_PREFIX):]
+        for field in BODY_FIELDS
+        if is_ref(row.get(field)) and row[field][len(REF_PREFIX):] in trusted
+    }
+
+
+async def store_bodies(row: dict) -> dict:
+    """
+    Replace large body fields with content-addressed references, uploading
+    only blobs that aren't stored yet. Returns the row to insert.
+    """
+    if not HISTORY_BLOB_STORAGE:
+        return row
+
+    row = dict(row)
+    pending = {}
+    for field in BODY_FIELDS:
+        value = row.get(field)
+        if not isinstance(value, str) or len(value) < BLOB_MIN_BYTES:
+            continue
+        raw = value.encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        pending[digest] = (raw, value)
+        row[field] = REF_PREFIX + digest
+    if not pending:
+        return row
+    row[HASHES_FIELD] = sorted(pending)
+
+    existing = await execute(
+        lambda db: db.table(TABLE).select("hash").in_("hash", list(pending))
+    )
+    stored = {blob["hash"] for blob in existing.data}
+    missing = [digest for digest in pending if digest not in stored]
+    if missing:
+        blobs = []
+        for digest in missing:
+            raw = pending[digest][0]
+            encoding, packed = _compress(raw)
+            blobs.append({
+                "hash": digest,
+                "encoding": encoding,
+                "data": base64.b64encode(packed).decode("ascii"),
+                "size": len(raw),
+            })
+        await execute(
+            lambda db: db.table(TABLE).upsert(blobs, on_conflict="hash", ignore_duplicates=True)
+        )
+
+    for digest, (_, value) in pending.items():
+        blob_cache.set(digest, value)
+    return row
+
+
+async def resolve_bodies(rows: list) -> list:
+    """
+    Replace blob references in rows with their content, fetching missing blobs
+    in one query. Only references listed in the row's blob_hashes (written by
+    store_bodies, never by the client) are resolved; others are left as they are.
+    """
+    wanted = set()
+    for row in rows:
+        wanted |= _row_digests(row)
+    if not HISTORY_BLOB_STORAGE or not wanted:
+        for row in rows:
+            row.pop(HASHES_FIELD, None)
+        return rows
+
+    contents = {}
+    for digest in wanted:
+        cached = blob_cache.get(digest)
+        if cached is not None:
+            contents[digest] = cached
+    to_fetch = [digest for digest in wanted if digest not in contents]
+    if to_fetch:
+        response = await execute(
+            lambda db: db.table(TABLE).select("hash,encoding,data").in_("hash", to_fetch)
+        )
+        for blob in response.data:
+            value = _decompress(blob["encoding"], base64.b64decode(blob["data"])).decode("utf-8")
+            contents[blob["hash"]] = value
+            blob_cache.set(blob["hash"], value)
+
+    for row in rows:
+        trusted = _row_digests(row)
+        for field in BODY_FIELDS:
+            if is_ref(row.get(field)) and row[field][len(REF_PREFIX):] in trusted:
+                row[field] = contents.get(row[field][len(REF_PREFIX):])
+        row.pop(HASHES_FIELD, None)
+    return rows
+
+
+async def _referenced(digests, history_table: str) -> set:
+    """The digests among digests that some row of history_table references."""
+    refs = ",".join(f'"{REF_PREFIX}{digest}"' for digest in digests)
+    response = await execute(
+        lambda db: db.table(history_table)
+        .select(",".join(BODY_FIELDS))
+        .or_(",".join(f"{field}.in.({refs})" for field in BODY_FIELDS))
+    )
+    return {value[len(REF_PREFIX):] for row in response.data for value in row.values() if is_ref(value)}
+
+
+async def release_bodies(rows: list, history_table: str) -> int:
+    """
+    Delete the blobs referenced by rows (just deleted from history_table)
+    that no remaining history row references. Returns how many were removed.
+    """
+    digests = set()
+    for row in rows:
+        digests |= _row_digests(row)
+    if not digests:
+        return 0
+
+    unreferenced = list(digests - await _referenced(digests, history_table))
+    if not unreferenced:
+        return 0
+    deleted = await execute(lambda db: db.table(TABLE).delete().in_("hash", unreferenced))
+    # A row saved meanwhile may have found a blob before it was deleted; put those back.
+    # (create_history re-checks its blobs after inserting, covering the opposite order.)
+    revived = await _referenced(unreferenced, history_table)
+    restore = [blob for blob in deleted.data if blob["hash"] in revived]
+    if restore:
+        await execute(
+            lambda db: db.table(TABLE).upsert(restore, on_conflict="hash", ignore_duplicates=True)
+        )
+    return len(deleted.data) - len(restore)
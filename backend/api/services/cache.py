@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so cosmetic differences don't change cache keys."""
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def content_hash(*parts) -> str:
+    """Return a SHA-256 hex digest over the normalized parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(normalize_text(str(part)).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU cache with an optional TTL.
+    With max_bytes set, values must support len() and the cache also evicts
+    to stay within that byte budget.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = None, max_bytes: int = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _size(self, value) -> int:
+        return len(value) if self.max_bytes else 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._data[key]
+                self.bytes -= self._size(value)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: float = None):
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.time() + ttl if ttl else None
+        size = self._size(value)
+        if self.max_bytes and size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self.bytes -= self._size(previous[0])
+            self._data[key] = (value, expires_at)
+            self.bytes += size
+            while len(self._data) > self.max_entries or (
+                self.max_bytes and self.bytes > self.max_bytes
+            ):
+                _, (evicted, _) = self._data.popitem(last=False)
+                self.bytes -= self._size(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        stats = {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+        if self.max_bytes:
+            stats["bytes"] = self.bytes
+            stats["max_bytes"] = self.max_bytes
+        return stats
+
+
+class SQLiteCache:
+    """Persistent JSON key/value tier backed by a local SQLite file."""
+
+    def __init__(self, path: str, ttl: float = None):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at < time.time():
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+            self.hits += 1
+            return json.loads(value)
+
+    def set(self, key, value, ttl: float = None):
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires_at),
+            )
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        return {"path": self.path, "hits": self.hits, "misses": self.misses}
+
+
+class TieredCache:
+    """In-memory LRU in front of an optional persistent SQLite tier."""
+
+    def __init__(self, memory: LRUCache, disk: SQLiteCache = None):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def stats(self) -> dict:
+        stats = {"memory": self.memory.stats()}
+        if self.disk is not None:
+            stats["disk"] = self.disk.stats()
+        return stats
@@ -1,11 +1,87 @@
-from docx import Document
-from htmldocx import HtmlToDocx
 from io import BytesIO
+from api.services.cache import LRUCache
+from api.services.workers import WorkerPool
+from api.services.metrics import register_stats
+from api.services.singleflight import SingleFlight
+import hashlib
+import os
 import re
 
 
+# Bump when the PDF stylesheet or DOCX defaults change so cached renders are not reused.
+EXPORT_TEMPLATE_VERSION = "2"
+EXPORT_CACHE_ENTRIES = int(os.getenv("EXPORT_CACHE_ENTRIES", "256"))
+EXPORT_CACHE_BYTES = int(os.getenv("EXPORT_CACHE_MB", "64")) * 1024 * 1024
+
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "2"))
+EXPORT_MAX_QUEUE = int(os.getenv("EXPORT_MAX_QUEUE", "8"))
+EXPORT_TIMEOUT_SECONDS = float(os.getenv("EXPORT_TIMEOUT_SECONDS", "30"))
+EXPORT_MEMORY_LIMIT_MB = int(os.getenv("EXPORT_MEMORY_LIMIT_MB", "1024"))
+# "auto" tries the native reportlab renderer first; "xhtml2pdf" always uses xhtml2pdf.
+PDF_RENDERER = os.getenv("PDF_RENDERER", "auto")
+
+export_cache = LRUCache(EXPORT_CACHE_ENTRIES, max_bytes=EXPORT_CACHE_BYTES)
+export_flight = SingleFlight("export")
+# Separate from the parse pool so large exports never delay analysis uploads.
+export_pool = WorkerPool(
+    "export",
+    EXPORT_WORKERS,
+    EXPORT_TIMEOUT_SECONDS,
+    max_queue=EXPORT_MAX_QUEUE,
+    memory_limit_mb=EXPORT_MEMORY_LIMIT_MB,
+)
+
+
+def get_export_cache_stats() -> dict:
+    """Return hit/miss and byte counters for the export cache."""
+    return export_cache.stats()
+
+
+def get_export_pool_stats() -> dict:
+    return export_pool.stats()
+
+
+register_stats("export_cache", get_export_cache_stats)
+register_stats("export_pool", get_export_pool_stats)
+
+
+def shutdown_export_pool():
+    """Stop the export workers; called on application shutdown."""
+    export_pool.shutdown()
+
+
+def export_etag(html_content: str, fmt: str) -> str:
+    """Strong ETag for a render: hash of the HTML, output format and template version."""
+    digest = hashlib.sha256(html_content.encode("utf-8")).hexdigest()
+    return f'"{fmt}-{EXPORT_TEMPLATE_VERSION}-{digest[:32]}"'
+
+
+async def render_export(html_content: str, fmt: str) -> tuple:
+    """
+    Return (bytes, etag) for "pdf" or "docx". Identical content is served from
+    the cache, or shares a render already in flight; otherwise it is rendered
+    in the export worker pool.
+    """
+    etag = export_etag(html_content, fmt)
+    cached = export_cache.get(etag)
+    if cached is not None:
+        return cached, etag
+
+    async def render():
+        renderer = {"pdf": export_pdf, "docx": export_docx}[fmt]
+        content = await export_pool.run(renderer, html_content)
+        export_cache.set(etag, content)
+        return content
+
+    return await export_flight.do(etag, render), etag
+
+
 def export_docx(html_content: str) -> bytes:
     """Convert HTML content to DOCX bytes."""
+    # Imported here (in the export workers) rather than at module load to keep cold starts short
+    from docx import Document
+    from htmldocx import HtmlToDocx
+
     doc = Document()
 
     # Set default font
@@ -25,6 +101,21 @@ def export_docx(html_content: str) -> bytes:
 
 
 def export_pdf(html_content: str) -> bytes:
+    """Convert HTML content to PDF bytes, preferring the native reportlab renderer."""
+    if PDF_RENDERER != "xhtml2pdf":
+        try:
+            from api.services.pdf_native import render_pdf_native, UnsupportedHTML
+        except ImportError:
+            pass
+        else:
+            try:
+                return render_pdf_native(html_content)
+            except UnsupportedHTML:
+                pass
+    return export_pdf_xhtml2pdf(html_content)
+
+
+def export_pdf_xhtml2pdf(html_content: str) -> bytes:
     """Convert HTML content to PDF bytes using a simple approach."""
     # Build a full HTML document with styling
     full_html = f"""<!DOCTYPE html>
@@ -0,0 +1,121 @@
+import base64
+import binascii
+import json
+from api.services.supabase import execute
+from api.services import blob_store
+
+TABLE = "history"
+# Columns needed to draw the history list; bodies are loaded via get_history.
+SUMMARY_COLUMNS = "id,job_title,ats_score,created_at,source_type,matched_keywords,missing_keywords"
+
+
+async def count_history() -> int:
+    response = await execute(
+        lambda db: db.table(TABLE).select("count", count="exact").limit(1)
+    )
+    return response.count
+
+
+async def list_history(user_id: str) -> list:
+    """All history entries for a user, newest first."""
+    response = await execute(
+        lambda db: db.table(TABLE)
+        .select("*")
+        .eq("user_id", user_id)
+        .order("created_at", desc=True)
+    )
+    return await blob_store.resolve_bodies(response.data)
+
+
+def encode_cursor(row: dict) -> str:
+    """Opaque keyset cursor pointing just past row in (created_at, id) order."""
+    payload = json.dumps({"created_at": row["created_at"], "id": row["id"]})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        after = {"created_at": str(payload["created_at"]), "id": str(payload["id"])}
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid history cursor")
+    # Values are interpolated into a PostgREST filter, so refuse anything that could escape the quotes
+    if any(char in value for value in after.values() for char in '"\\'):
+        raise ValueError("Invalid history cursor")
+    return after
+
+
+async def list_history_summaries(user_id: str, limit: int = 20, cursor: str = None) -> tuple:
+    """
+    One page of summary rows, newest first, and the cursor for the next page
+    (None on the last page). Keyword lists are reduced to counts, except the
+    matched keywords the list view previews.
+    """
+    after = decode_cursor(cursor) if cursor else None
+
+    def build(db):
+        query = db.table(TABLE).select(SUMMARY_COLUMNS).eq("user_id", user_id)
+        if after:
+            created_at, row_id = after["created_at"], after["id"]
+            query = query.or_(
+                f'created_at.lt."{created_at}",'
+                f'and(created_at.eq."{created_at}",id.lt."{row_id}")'
+            )
+        # Fetch one extra row to learn whether another page exists
+        return query.order("created_at", desc=True).order("id", desc=True).limit(limit + 1)
+
+    response = await execute(build)
+    rows = response.data[:limit]
+    next_cursor = encode_cursor(rows[-1]) if len(response.data) > limit else None
+
+    summaries = []
+    for row in rows:
+        matched = row.pop("matched_keywords", None) or []
+        missing = row.pop("missing_keywords", None) or []
+        summaries.append(
+            dict(row, matched_keywords=matched, matched_count=len(matched), missing_count=len(missing))
+        )
+    return summaries, next_cursor
+
+
+async def create_history(user_id: str, data: dict):
+    """
+    Insert a history entry and return the stored row (or None). Raises
+    ValueError when a body looks like a blob reference.
+    """
+    blob_store.check_bodies(data)
+    row = await blob_store.store_bodies(dict(data, user_id=user_id))
+    response = await execute(lambda db: db.table(TABLE).insert(row), idempotent=False)
+    if not response.data:
+        return None
+    if any(blob_store.is_ref(row.get(field)) for field in blob_store.BODY_FIELDS):
+        # A concurrent delete_history may have dropped a shared blob between
+        # the upload check and the insert; this uploads any that went missing
+        await blob_store.store_bodies(dict(data, user_id=user_id))
+    # Hand back the bodies we were given rather than their blob references
+    stored = response.data[0]
+    stored.pop(blob_store.HASHES_FIELD, None)
+    stored.update({field: data[field] for field in blob_store.BODY_FIELDS if field in data})
+    return stored
+
+
+async def get_history(user_id: str, history_id: str) -> dict:
+    """Fetch one entry owned by the user; raises LookupError when missing."""
+    response = await execute(
+        lambda db: db.table(TABLE)
+        .select("*")
+        .eq("id", history_id)
+        .eq("user_id", user_id)
+        .limit(1)
+    )
+    if not response.data:
+        raise LookupError(f"No history entry {history_id}")
+    return (await blob_store.resolve_bodies(response.data))[0]
+
+
+async def delete_history(user_id: str, history_id: str):
+    """Delete one entry, then any of its body blobs no other entry shares."""
+    response = await execute(
+        lambda db: db.table(TABLE).delete().eq("id", history_id).eq("user_id", user_id)
+    )
+    await blob_store.release_bodies(response.data, TABLE)
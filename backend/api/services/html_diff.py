@@ -0,0 +1,36 @@
+import hashlib
+from difflib import SequenceMatcher
+from api.services.cache import normalize_text
+from api.services.sections import split_nodes
+
+
+def base_hash(html: str) -> str:
+    """Fingerprint of the document a patch applies to."""
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()[:16]
+
+
+def diff_html(base: str, modified: str) -> dict:
+    """
+    Node-level patch turning base into modified. Operations refer to indexes of
+    base's top-level nodes (see split_nodes) and don't shift each other:
+      {"op": "replace", "index": i, "count": n, "html": ...}
+      {"op": "insert", "index": i, "html": ...}   (before base node i)
+      {"op": "delete", "index": i, "count": n}
+    Nodes differing only in whitespace count as unchanged.
+    """
+    old_nodes = split_nodes(base)
+    new_nodes = split_nodes(modified)
+    matcher = SequenceMatcher(
+        None, [normalize_text(node) for node in old_nodes], [normalize_text(node) for node in new_nodes],
+        autojunk=False,
+    )
+    operations = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "replace":
+            operations.append({"op": "replace", "index": i1, "count": i2 - i1, "html": "".join(new_nodes[j1:j2])})
+        elif tag == "insert":
+            operations.append({"op": "insert", "index": i1, "html": "".join(new_nodes[j1:j2])})
+        elif tag == "delete":
+            operations.append({"op": "delete", "index": i1, "count": i2 - i1})
+    return {"base_hash": base_hash(base), "nodes": len(old_nodes), "operations": operations}
+
@@ -0,0 +1,370 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from api.services.metrics import observe, register_stats
+
+
+JOB_STORE_DB = os.getenv("JOB_STORE_DB", os.path.join(tempfile.gettempdir(), "resume-ats-jobs.sqlite3"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_MAX_QUEUE = int(os.getenv("JOB_MAX_QUEUE", "100"))
+# Finished jobs (and their results) are kept this long so retries and reconnects reuse them
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", "86400"))
+# Several processes can share JOB_STORE_DB: each keeps a lease on the jobs it
+# runs and only takes over jobs whose lease has run out (their process died)
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "30"))
+# How often a waiter re-reads a job another process may be running
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1"))
+
+FINISHED_STATES = ("succeeded", "failed")
+_UNFINISHED = "status IN ('queued', 'running')"
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised when JOB_MAX_QUEUE jobs are already waiting."""
+
+
+def _timestamp(seconds):
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat() if seconds else None
+
+
+class JobStore:
+    """
+    Jobs persisted in a local SQLite file: inputs until the job finishes,
+    then the result or error until it expires. Unfinished jobs carry the
+    owner (process) running them and when its lease on them runs out.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, kind TEXT NOT NULL, dedupe_key TEXT, status TEXT NOT NULL, "
+            "payload TEXT, upload BLOB, result TEXT, error TEXT, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL, expires_at REAL, "
+            "owner TEXT, lease_until REAL)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, kind in (("owner", "TEXT"), ("lease_until", "REAL")):
+            if column not in columns:
+                # Stores created before leases existed
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_dedupe_key ON jobs (dedupe_key)")
+        self._conn.commit()
+
+    def _write(self, sql: str, params: tuple):
+        with self._lock:
+            self._conn.execute(sql, params)
+            self._conn.commit()
+
+    def create(
+        self, kind: str, payload: dict, upload: bytes = None, dedupe_key: str = None,
+        owner: str = None, lease_until: float = None,
+    ) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._write(
+            "INSERT INTO jobs (id, kind, dedupe_key, status, payload, upload, created_at, updated_at, "
+            "owner, lease_until) VALUES (?, ?, ?, 'queued', ?, ?, ?, ?, ?, ?)",
+            (job_id, kind, dedupe_key, json.dumps(payload), upload, now, now, owner, lease_until),
+        )
+        return job_id
+
+    def get(self, job_id: str):
+        """The public view of a job, or None when it is unknown or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, kind, status, result, error, created_at, updated_at, expires_at "
+                "FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None or (row[7] is not None and row[7] < time.time()):
+            return None
+        job_id, kind, status, result, error, created_at, updated_at, expires_at = row
+        return {
+            "id": job_id,
+            "kind": kind,
+            "status": status,
+            "result": json.loads(result) if result else None,
+            "error": json.loads(error) if error else None,
+            "created_at": _timestamp(created_at),
+            "updated_at": _timestamp(updated_at),
+            "expires_at": _timestamp(expires_at),
+        }
+
+    def find(self, dedupe_key: str):
+        """The newest unexpired job with this key that has not failed, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE dedupe_key = ? AND status != 'failed' "
+                "AND (expires_at IS NULL OR expires_at >= ?) ORDER BY created_at DESC LIMIT 1",
+                (dedupe_key, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def inputs(self, job_id: str) -> tuple:
+        """(kind, payload, upload) for a job that has not finished yet."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT kind, payload, upload FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return row[0], json.loads(row[1] or "{}"), row[2]
+
+    def mark_running(self, job_id: str):
+        self._write("UPDATE jobs SET status = 'running', updated_at = ? WHERE id = ?", (time.time(), job_id))
+
+    def finish(self, job_id: str, retention: float, result=None, error: dict = None):
+        """Store the outcome, drop the inputs and start the retention clock."""
+        now = time.time()
+        self._write(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, payload = NULL, upload = NULL, "
+            "updated_at = ?, expires_at = ? WHERE id = ?",
+            (
+                "failed" if error is not None else "succeeded",
+                json.dumps(result) if error is None else None,
+                json.dumps(error) if error is not None else None,
+                now,
+                now + retention,
+                job_id,
+            ),
+        )
+
+    def updated_at(self, job_id: str):
+        with self._lock:
+            row = self._conn.execute("SELECT updated_at FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def claim(self, owner: str, lease_until: float) -> list:
+        """
+        Take over unfinished jobs that have no owner or whose owner's lease
+        has expired; returns the ids of every unfinished job owner now holds,
+        oldest first.
+        """
+        with self._lock:
+            # One UPDATE, so two processes can never claim the same job
+            self._conn.execute(
+                f"UPDATE jobs SET owner = ?, lease_until = ? WHERE {_UNFINISHED} "
+                "AND (owner IS NULL OR lease_until IS NULL OR lease_until < ?)",
+                (owner, lease_until, time.time()),
+            )
+            self._conn.commit()
+            rows = self._conn.execute(
+                f"SELECT id FROM jobs WHERE owner = ? AND {_UNFINISHED} ORDER BY created_at", (owner,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def renew(self, owner: str, lease_until: float):
+        """Extend owner's lease on its unfinished jobs."""
+        self._write(
+            f"UPDATE jobs SET lease_until = ? WHERE owner = ? AND {_UNFINISHED}", (lease_until, owner)
+        )
+
+    def purge(self) -> int:
+        """Delete expired jobs; returns how many were removed."""
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM jobs WHERE expires_at < ?", (time.time(),)).rowcount
+            self._conn.commit()
+        return deleted
+
+    def counts(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+
+class JobQueue:
+    """
+    Runs jobs of registered kinds on in-process asyncio workers, at most
+    `workers` at a time, persisting every state change in a JobStore so
+    queued and interrupted jobs are picked up again after a restart. Each
+    process only runs the jobs it holds a lease on.
+    """
+
+    def __init__(self, path: str, workers: int, max_queue: int, retention: float, lease: float):
+        self.path = path
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.retention = retention
+        self.lease = lease
+        # Unique per process, even when a pid is reused
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._store = None
+        self._active = set()  # ids of jobs started by this process
+        self._heartbeat = None
+        self._handlers = {}
+        self._slots = None
+        self._changed = {}  # job id -> asyncio.Event set on its next state change
+        self._tasks = set()
+        self.queued = 0
+        self.running = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.reused = 0
+
+    @property
+    def store(self) -> JobStore:
+        # Opened on first use so importing the app never touches the disk
+        if self._store is None:
+            self._store = JobStore(self.path)
+        return self._store
+
+    def register(self, kind: str, handler):
+        """handler(payload, upload) is a coroutine returning the job's JSON result."""
+        self._handlers[kind] = handler
+
+    def submit(self, kind: str, payload: dict, upload: bytes = None, dedupe_key: str = None) -> tuple:
+        """
+        Queue a job and return (job, reused). With a dedupe_key, an unexpired
+        job for the same input is returned instead of running the work again.
+        """
+        if dedupe_key:
+            existing = self.store.find(dedupe_key)
+            job = self.store.get(existing) if existing else None
+            if job is not None:
+                self.reused += 1
+                return job, True
+        if self.max_queue and self.queued >= self.max_queue:
+            raise JobQueueFullError("Too many jobs are waiting, please retry shortly")
+
+        self.store.purge()
+        job_id = self.store.create(
+            kind, payload, upload, dedupe_key, owner=self.owner, lease_until=time.time() + self.lease
+        )
+        self._start(job_id)
+        return self.store.get(job_id), False
+
+    def get(self, job_id: str):
+        return self.store.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> bool:
+        """
+        Wait up to timeout seconds for the job's next state change. Jobs run
+        by another process sharing the store are re-read every JOB_POLL_SECONDS.
+        """
+        event = self._changed.setdefault(job_id, asyncio.Event())
+        updated_at = self.store.updated_at(job_id)
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            try:
+                await asyncio.wait_for(event.wait(), min(remaining, JOB_POLL_SECONDS))
+                return True
+            except asyncio.TimeoutError:
+                if job_id not in self._active and self.store.updated_at(job_id) != updated_at:
+                    return True
+
+    def resume(self) -> int:
+        """
+        Start the jobs whose owner died (or that predate leases) and keep
+        doing so, renewing this process's own leases; called on startup.
+        """
+        self.store.purge()
+        started = self._claim()
+        if self._heartbeat is None:
+            self._heartbeat = asyncio.create_task(self._keep_leases())
+        return started
+
+    def _claim(self) -> int:
+        job_ids = [
+            job_id for job_id in self.store.claim(self.owner, time.time() + self.lease)
+            if job_id not in self._active
+        ]
+        for job_id in job_ids:
+            self._start(job_id)
+        if job_ids:
+            logger.info("Resumed %d unfinished jobs", len(job_ids))
+        return len(job_ids)
+
+    async def _keep_leases(self):
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                self.store.renew(self.owner, time.time() + self.lease)
+                self._claim()
+            except Exception:
+                logger.exception("Could not renew job leases")
+
+    def _notify(self, job_id: str):
+        event = self._changed.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    def _start(self, job_id: str):
+        self._active.add(job_id)
+        self.queued += 1
+        task = asyncio.create_task(self._run(job_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, job_id: str):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        queued_at = time.monotonic()
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+        started_at = time.monotonic()
+        self.running += 1
+        kind = "unknown"
+        try:
+            kind, payload, upload = self.store.inputs(job_id)
+            self.store.mark_running(job_id)
+            self._notify(job_id)
+            handler = self._handlers.get(kind)
+            if handler is None:
+                raise ValueError(f"Unknown job kind: {kind}")
+            result = await handler(payload, upload)
+            self.store.finish(job_id, self.retention, result=result)
+            self.succeeded += 1
+        except Exception as e:
+            # Handlers raise HTTP-style errors; keep their status for the client
+            error = {
+                "status": getattr(e, "status_code", 500),
+                "detail": getattr(e, "detail", None) or str(e),
+            }
+            self.store.finish(job_id, self.retention, error=error)
+            self.failed += 1
+        finally:
+            self.running -= 1
+            self._slots.release()
+            observe("job-queue", started_at - queued_at)
+            observe(f"job-{kind}", time.monotonic() - started_at)
+            self._active.discard(job_id)
+            self._notify(job_id)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queued": self.queued,
+            "running": self.running,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "reused": self.reused,
+        }
+
+
+job_queue = JobQueue(JOB_STORE_DB, JOB_WORKERS, JOB_MAX_QUEUE, JOB_RETENTION_SECONDS, JOB_LEASE_SECONDS)
+
+
+def get_job_stats() -> dict:
+    return job_queue.stats()
+
+
+register_stats("jobs", get_job_stats)
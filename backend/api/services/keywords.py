@@ -0,0 +1,330 @@
+import re
+from collections import deque
+
+
+# Canonical skill names. Multi-word entries are matched as token phrases.
+SKILLS = [
+    # Languages
+    "Python", "Java", "JavaScript", "TypeScript", "C", "C++", "C#", "Go", "Rust",
+    "Ruby", "PHP", "Swift", "Kotlin", "Scala", "R", "MATLAB", "Perl", "Bash",
+    "SQL", "HTML", "CSS", "Sass", "Dart", "Elixir", "Haskell", "Objective-C",
+    # Frameworks and libraries
+    "React", "React Native", "Angular", "Vue.js", "Next.js", "Node.js", "Express",
+    "Django", "Flask", "FastAPI", "Spring", "Spring Boot", "Ruby on Rails", ".NET",
+    "ASP.NET", "Laravel", "jQuery", "Redux", "GraphQL", "REST APIs", "gRPC",
+    "Tailwind CSS", "Bootstrap", "Flutter", "Pandas", "NumPy", "SciPy",
+    "scikit-learn", "TensorFlow", "PyTorch", "Keras", "Spark", "Hadoop", "Airflow",
+    "dbt", "Kafka", "RabbitMQ", "Celery",
+    # Data stores
+    "PostgreSQL", "MySQL", "SQLite", "MongoDB", "Redis", "Elasticsearch",
+    "Cassandra", "DynamoDB", "Oracle", "SQL Server", "Snowflake", "BigQuery",
+    "Redshift", "Supabase", "Firebase",
+    # Cloud and infrastructure
+    "AWS", "Azure", "Google Cloud", "Docker", "Kubernetes", "Terraform", "Ansible",
+    "Jenkins", "GitHub Actions", "GitLab CI", "CI/CD", "Linux", "Nginx", "Serverless",
+    "Lambda", "EC2", "S3", "Helm", "Prometheus", "Grafana", "Datadog", "Vercel",
+    "Netlify", "Microservices",
+    # Practices and tools
+    "Git", "Agile", "Scrum", "Kanban", "Jira", "Confluence", "TDD", "Unit Testing",
+    "Integration Testing", "Selenium", "Cypress", "Jest", "Pytest", "DevOps",
+    "Machine Learning", "Deep Learning", "Natural Language Processing",
+    "Computer Vision", "Data Analysis", "Data Engineering", "Data Visualization",
+    "ETL", "Statistics", "A/B Testing", "Tableau", "Power BI", "Excel", "Looker",
+    "Figma", "Sketch", "UX", "UI", "Accessibility", "SEO", "Object-Oriented Programming",
+    "System Design", "Distributed Systems", "Security", "OAuth", "Networking",
+    "Large Language Models", "Generative AI", "Prompt Engineering",
+    # Business and soft skills commonly screened for
+    "Project Management", "Product Management", "Stakeholder Management",
+    "Leadership", "Mentoring", "Communication", "Problem Solving",
+    "Cross-functional Collaboration", "Salesforce", "SAP", "HubSpot",
+    "Financial Modeling", "Budgeting", "Forecasting", "Customer Success",
+    "PMP", "AWS Certified", "CPA", "Six Sigma",
+]
+
+# Alternate spellings mapped to the canonical name in SKILLS.
+ALIASES = {
+    "js": "JavaScript",
+    "ecmascript": "JavaScript",
+    "ts": "TypeScript",
+    "golang": "Go",
+    "python3": "Python",
+    "k8s": "Kubernetes",
+    "postgres": "PostgreSQL",
+    "psql": "PostgreSQL",
+    "mongo": "MongoDB",
+    "reactjs": "React",
+    "react.js": "React",
+    "vue": "Vue.js",
+    "vuejs": "Vue.js",
+    "angularjs": "Angular",
+    "node": "Node.js",
+    "nodejs": "Node.js",
+    "nextjs": "Next.js",
+    "express.js": "Express",
+    "expressjs": "Express",
+    "rails": "Ruby on Rails",
+    "ror": "Ruby on Rails",
+    "dotnet": ".NET",
+    "csharp": "C#",
+    "cpp": "C++",
+    "amazon web services": "AWS",
+    "microsoft azure": "Azure",
+    "gcp": "Google Cloud",
+    "google cloud platform": "Google Cloud",
+    "sklearn": "scikit-learn",
+    "ml": "Machine Learning",
+    "dl": "Deep Learning",
+    "nlp": "Natural Language Processing",
+    "llm": "Large Language Models",
+    "llms": "Large Language Models",
+    "genai": "Generative AI",
+    "gen ai": "Generative AI",
+    "ci cd": "CI/CD",
+    "continuous integration": "CI/CD",
+    "rest": "REST APIs",
+    "restful": "REST APIs",
+    "rest api": "REST APIs",
+    "restful apis": "REST APIs",
+    "oop": "Object-Oriented Programming",
+    "object oriented programming": "Object-Oriented Programming",
+    "test driven development": "TDD",
+    "ab testing": "A/B Testing",
+    "powerbi": "Power BI",
+    "ms excel": "Excel",
+    "microsoft excel": "Excel",
+    "mssql": "SQL Server",
+    "microsoft sql server": "SQL Server",
+    "elastic search": "Elasticsearch",
+    "shell scripting": "Bash",
+    "user experience": "UX",
+    "user interface": "UI",
+    "a11y": "Accessibility",
+    "micro services": "Microservices",
+    "microservice": "Microservices",
+    "project manager": "Project Management",
+    "product manager": "Product Management",
+    "cross functional": "Cross-functional Collaboration",
+    "mentorship": "Mentoring",
+    "unit tests": "Unit Testing",
+    "aws lambda": "Lambda",
+    "amazon s3": "S3",
+    "amazon ec2": "EC2",
+}
+
+# Single-token canonical names that are also ordinary words or letters. They
+# only match with exactly this capitalization, never inside compounds such as
+# "R&D", "C-level" or "go-to-market", and (unless all caps) not at the start
+# of a sentence unless a list separator follows ("Go, Rust" but not "Go to").
+_CASE_SENSITIVE = {"Go", "R", "C", "UI", "UX", "Spring", "Express", "Excel", "Security", "Lambda"}
+# Aliases that are common words ("the rest of", "node", "ml") are held to the
+# same rules, with the spelling given here.
+_CASE_SENSITIVE_ALIASES = {
+    "rest": "REST",
+    "ml": "ML",
+    "ts": "TS",
+    "node": "Node",
+    "rails": "Rails",
+    "vue": "Vue",
+}
+
+STOPWORDS = set(
+    "a an and are as at be been but by can for from has have in into is it its of on "
+    "or our over such that the their them they this to was we were will with within "
+    "you your who what when where which while about across all also any more most "
+    "must other should than using use used work working team teams role years year "
+    "experience strong ability including etc plus preferred required requirements "
+    "responsibilities job position candidate ideal looking join company build help "
+    "new well good great high based related knowledge skills skill understanding".split()
+)
+
+_TOKEN_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9+#./-]*[A-Za-z0-9+#]|[A-Za-z0-9]|\.[A-Za-z]+")
+
+
+def _scan(text: str):
+    """Yield (normalized, original, start) for each token of text."""
+    for match in _TOKEN_RE.finditer(text or ""):
+        original = match.group(0).rstrip(".")
+        if original:
+            yield normalize_token(original), original, match.start()
+
+
+def tokenize(text: str) -> list:
+    """Split text into (normalized, original) tokens, keeping C++, C#, Node.js etc. intact."""
+    return [(normalized, original) for normalized, original, _ in _scan(text)]
+
+
+def normalize_token(token: str) -> str:
+    """Lowercase a token and drop hyphens/slashes that vary between spellings."""
+    token = token.lower()
+    if token in ("c++", "c#", "ci/cd", "a/b", ".net", "asp.net"):
+        return token
+    return token.replace("-", " ").replace("/", " ").strip()
+
+
+def _phrase_tokens(phrase: str) -> tuple:
+    words = []
+    for normalized, _ in tokenize(phrase):
+        words.extend(normalized.split())
+    return tuple(words)
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over token sequences for multi-pattern phrase matching."""
+
+    def __init__(self, patterns: dict):
+        # patterns maps token tuples to the value reported for a match
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        for tokens, canonical in patterns.items():
+            self._add(tokens, canonical)
+        self._build()
+
+    def _add(self, tokens: tuple, value):
+        state = 0
+        for token in tokens:
+            nxt = self._goto[state].get(token)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][token] = nxt
+            state = nxt
+        self._output[state].append((value, len(tokens)))
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                candidate = self._goto[fail].get(token, 0)
+                self._fail[nxt] = candidate if candidate != nxt else 0
+                self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+
+    def search(self, tokens: list):
+        """Yield (value, start_index, length) for every phrase occurrence."""
+        state = 0
+        for index, token in enumerate(tokens):
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            for value, length in self._output[state]:
+                yield value, index - length + 1, length
+
+
+def _build_automaton() -> KeywordAutomaton:
+    # Values are (canonical, spelling a single-word match must have, or None)
+    patterns = {}
+    for skill in SKILLS:
+        patterns[_phrase_tokens(skill)] = (skill, skill if skill in _CASE_SENSITIVE else None)
+    for alias, canonical in ALIASES.items():
+        patterns.setdefault(_phrase_tokens(alias), (canonical, _CASE_SENSITIVE_ALIASES.get(alias)))
+    return KeywordAutomaton(patterns)
+
+
+_automaton = _build_automaton()
+
+
+def _words(text: str):
+    """Yield (word, original_piece, start, end) for each normalized word of text."""
+    for normalized, original, start in _scan(text):
+        words = normalized.split()
+        # "Python/Go" yields one word per piece; keep each piece's own spelling and offsets
+        pieces = [(m.group(0), start + m.start(), start + m.end()) for m in re.finditer(r"[^-/]+", original)]
+        if len(pieces) != len(words):
+            pieces = [(original, start, start + len(original))] * len(words)
+        for word, (piece, piece_start, piece_end) in zip(words, pieces):
+            yield word, piece, piece_start, piece_end
+
+
+def _plausible(text: str, piece: str, start: int, end: int, spelling: str) -> bool:
+    """Whether an ambiguous short name at text[start:end] really names the skill."""
+    if piece != spelling:
+        return False
+    before = text[start - 1] if start else ""
+    after = text[end] if end < len(text) else ""
+    # "R&D", "C-level", "go-to-market"
+    if "&" in (before, after) or "-" in (before, after):
+        return False
+    if not spelling.isupper():
+        # At a sentence start capitalization says nothing ("Go to market", "Excel at")
+        preceding = text[:start].rstrip(" \t")
+        if (not preceding or preceding[-1] in ".!?:;\n\u2022*-") and after not in (",", "/", ")", ";", ".", "\n", "\r", ""):
+            return False
+    return True
+
+
+def extract_keywords(text: str) -> list:
+    """Return canonical skills mentioned in text, in order of first appearance."""
+    words = list(_words(text))
+    found = {}
+    for (canonical, spelling), start, length in _automaton.search([word for word, _, _, _ in words]):
+        if length == 1 and spelling and not _plausible(text, *words[start][1:], spelling):
+            continue
+        found.setdefault(canonical, start)
+    return sorted(found, key=found.get)
+
+
+def _content_terms(text: str) -> set:
+    return {
+        word
+        for normalized, _ in tokenize(text)
+        for word in normalized.split()
+        if len(word) > 2 and word not in STOPWORDS and not word.isdigit()
+    }
+
+
+def guess_job_title(job_description: str) -> str:
+    """Best-effort job title from an explicit label or a short first line."""
+    match = re.search(r"(?im)^\s*(?:job title|title|position|role)\s*[:\-]\s*(.+)$", job_description or "")
+    if match:
+        return match.group(1).strip()[:100]
+    for line in (job_description or "").splitlines():
+        line = line.strip()
+        if line:
+            return line if len(line) <= 80 else ""
+    return ""
+
+
+def match_keywords(resume_text: str, job_description: str) -> dict:
+    """
+    Deterministic keyword analysis: matched/missing skills from the job
+    description and a baseline ATS score, computed without an LLM.
+    """
+    required = extract_keywords(job_description)
+    present = set(extract_keywords(resume_text))
+    matched = [keyword for keyword in required if keyword in present]
+    missing = [keyword for keyword in required if keyword not in present]
+
+    # Blend skill coverage with general term overlap so postings that name few
+    # dictionary skills still get a meaningful score.
+    jd_terms = _content_terms(job_description)
+    term_coverage = len(jd_terms & _content_terms(resume_text)) / len(jd_terms) if jd_terms else 0.0
+    if required:
+        score = 0.7 * (len(matched) / len(required)) + 0.3 * term_coverage
+    else:
+        score = term_coverage
+
+    return {
+        "ats_score": int(round(score * 100)),
+        "matched_keywords": matched,
+        "missing_keywords": missing,
+    }
+
+
+def keyword_suggestions(missing_keywords: list, limit: int = 5) -> list:
+    """Templated suggestions for the fast analysis mode."""
+    suggestions = [
+        f"Add {keyword} to your skills section or a relevant experience bullet if you have used it."
+        for keyword in missing_keywords[:limit]
+    ]
+    if not suggestions:
+        suggestions.append(
+            "Your resume already covers the key skills in this posting; quantify results in your experience bullets."
+        )
+    return suggestions
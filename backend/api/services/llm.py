@@ -1,25 +1,465 @@
+import asyncio
 import json
-import google.generativeai as genai
 import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from api.services.cache import LRUCache, SQLiteCache, TieredCache, content_hash
+from api.services.keywords import match_keywords, guess_job_title, keyword_suggestions
+from api.services.sections import split_sections, assign_keywords
+from api.services.metrics import observe, record_tokens, register_stats
+from api.services.singleflight import SingleFlight
+from api.services.prompts import (
+    prepare_documents,
+    normalize_whitespace,
+    compact_html,
+    expand_html,
+    estimate_tokens,
+    log_compaction,
+)
 
 
-def get_model():
-    """Initialize and return Gemini model."""
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "32"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+
+MODEL_NAME = "gemini-flash-latest"
+# Faster tier for the structured scoring task and short prompts ("" disables tiering)
+FAST_MODEL_NAME = os.getenv("LLM_FAST_MODEL", "gemini-flash-lite-latest")
+LLM_FAST_TASKS = {task for task in os.getenv("LLM_FAST_TASKS", "analysis").split(",") if task}
+LLM_FAST_MAX_PROMPT_TOKENS = int(os.getenv("LLM_FAST_MAX_PROMPT_TOKENS", "1500"))
+# A duplicate request is fired once a call has run longer than this percentile
+# of the model's recent latencies (0 disables hedging)
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_MIN_SECONDS = float(os.getenv("LLM_HEDGE_MIN_SECONDS", "1"))
+# Hedge delay used until a model has LLM_HEDGE_MIN_SAMPLES latencies recorded
+LLM_HEDGE_INITIAL_SECONDS = float(os.getenv("LLM_HEDGE_INITIAL_SECONDS", "8"))
+LLM_HEDGE_MIN_SAMPLES = 20
+LLM_LATENCY_WINDOW = 200
+# The breaker opens when at least BREAKER_MIN_CALLS calls in the window failed at this rate
+LLM_BREAKER_FAILURE_RATE = float(os.getenv("LLM_BREAKER_FAILURE_RATE", "0.5"))
+LLM_BREAKER_MIN_CALLS = int(os.getenv("LLM_BREAKER_MIN_CALLS", "10"))
+LLM_BREAKER_WINDOW_SECONDS = float(os.getenv("LLM_BREAKER_WINDOW_SECONDS", "60"))
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30"))
+# While the breaker is open, "llm"/"hybrid" analyses return the local "fast" result
+LLM_DEGRADED_FALLBACK = os.getenv("LLM_DEGRADED_FALLBACK", "true").lower() == "true"
+# Bump whenever the analysis prompt or its post-processing changes so stale
+# cached analyses are not served.
+ANALYSIS_PROMPT_VERSION = "2"
+# "llm": Gemini does everything; "hybrid": local keyword matching, Gemini only
+# writes suggestions; "fast": local matching only, no Gemini call.
+ANALYSIS_MODES = ("llm", "hybrid", "fast")
+
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "512"))
+ANALYSIS_CACHE_TTL_SECONDS = float(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", "86400"))
+ANALYSIS_CACHE_DB = os.getenv("ANALYSIS_CACHE_DB", "")
+# HTML resumes at least this long get keywords applied section by section, in parallel
+KEYWORD_SECTION_MIN_CHARS = int(os.getenv("KEYWORD_SECTION_MIN_CHARS", "3000"))
+
+
+class LLMBusyError(RuntimeError):
+    """Raised when the LLM wait queue is full."""
+
+
+class LLMTimeoutError(TimeoutError):
+    """Raised when a Gemini call exceeds its timeout."""
+
+
+class LLMUnavailableError(RuntimeError):
+    """Raised without calling Gemini while the circuit breaker is open."""
+
+
+class LLMScheduler:
+    """Bounded-concurrency gate for Gemini calls with a wait queue and metrics."""
+
+    def __init__(self, max_concurrency: int, max_queue: int, timeout: float):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._semaphore = None
+        self.in_flight = 0
+        self.waiting = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @asynccontextmanager
+    async def slot(self, wait: float = None):
+        """Hold one concurrency slot for the duration of the block, waiting at most wait seconds for it."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if self._semaphore.locked() and self.max_queue and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise LLMBusyError("Too many analyses in progress, please retry shortly")
+
+        self.waiting += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), wait)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise LLMTimeoutError(f"LLM call timed out after waiting {wait:.1f}s for a slot")
+        finally:
+            self.waiting -= 1
+        waited = time.monotonic() - started
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        observe("llm-queue", waited)
+
+        self.in_flight += 1
+        called = time.monotonic()
+        try:
+            yield
+            self.completed += 1
+        except LLMTimeoutError:
+            self.timed_out += 1
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+            observe("llm", time.monotonic() - called)
+
+    async def run(self, factory, timeout: float = None, deadline: float = None):
+        """
+        Await factory() once a slot is free, enforcing the per-call timeout.
+        With a deadline (a time.monotonic() value) the wait for the slot counts
+        against it too, and the call gets whatever time is left.
+        """
+        timeout = timeout or self.timeout
+        wait = None if deadline is None else max(0.0, deadline - time.monotonic())
+        async with self.slot(wait):
+            if deadline is not None:
+                timeout = max(0.1, deadline - time.monotonic())
+            try:
+                return await asyncio.wait_for(factory(), timeout)
+            except asyncio.TimeoutError:
+                raise LLMTimeoutError(f"LLM call timed out after {timeout:.0f}s")
+
+    def stats(self) -> dict:
+        """Return queue depth, concurrency and wait-time counters."""
+        started = self.completed + self.failed + self.timed_out
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "rejected": self.rejected,
+            "avg_wait_seconds": round(self.total_wait / started, 4) if started else 0.0,
+            "max_wait_seconds": round(self.max_wait, 4),
+        }
+
+
+    def has_capacity(self) -> bool:
+        """True when a call would start right away instead of queueing."""
+        return self._semaphore is None or not self._semaphore.locked()
+
+
+class CircuitBreaker:
+    """
+    Fails Gemini calls fast once the recent failure rate spikes. After a
+    cooldown one probe call is let through; its outcome closes or reopens
+    the breaker.
+    """
+
+    def __init__(self, failure_rate: float, min_calls: int, window: float, cooldown: float):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.cooldown = cooldown
+        self.state = "closed"
+        self._calls = deque()  # (timestamp, failed)
+        self._opened_at = 0.0
+        self._probing = False
+        self.opened = 0
+        self.short_circuited = 0
+
+    def before_call(self):
+        """Raise LLMUnavailableError unless a call may go to Gemini now."""
+        if self.state == "open" and time.monotonic() - self._opened_at >= self.cooldown:
+            self.state = "half_open"
+        if self.state == "closed" or (self.state == "half_open" and not self._probing):
+            self._probing = self.state == "half_open"
+            return
+        self.short_circuited += 1
+        raise LLMUnavailableError(
+            "The AI service is failing right now; please retry in a few seconds"
+        )
+
+    def record(self, failed):
+        """Count a call's outcome; None (cancelled, or rejected as busy) only ends a probe."""
+        now = time.monotonic()
+        if self.state == "half_open":
+            self._probing = False
+            if failed is None:
+                return
+            if failed:
+                self._open(now)
+            else:
+                self.state = "closed"
+                self._calls.clear()
+            return
+
+        if failed is None:
+            return
+        self._calls.append((now, failed))
+        while self._calls and self._calls[0][0] < now - self.window:
+            self._calls.popleft()
+        failures = sum(1 for _, failed_call in self._calls if failed_call)
+        if (
+            self.state == "closed"
+            and len(self._calls) >= self.min_calls
+            and failures / len(self._calls) >= self.failure_rate
+        ):
+            self._open(now)
+
+    def _open(self, now: float):
+        self.state = "open"
+        self._opened_at = now
+        self._calls.clear()
+        self.opened += 1
+
+    def retry_after(self) -> int:
+        return max(1, int(self.cooldown - (time.monotonic() - self._opened_at)))
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "open": int(self.state != "closed"),
+            "opened": self.opened,
+            "short_circuited": self.short_circuited,
+        }
+
+
+class LLMRouter:
+    """Picks the model tier for a prompt and tracks per-model latency for hedging."""
+
+    def __init__(self, fast_model: str, fast_tasks: set, fast_max_tokens: int, hedge_percentile: float):
+        self.fast_model = fast_model
+        self.fast_tasks = fast_tasks
+        self.fast_max_tokens = fast_max_tokens
+        self.hedge_percentile = hedge_percentile
+        self._latencies = {}  # model -> recent call durations, cancelled calls included
+        self.routed = {}
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def model_for(self, prompt: str, task: str) -> str:
+        fast = self.fast_model and (
+            task in self.fast_tasks or estimate_tokens(prompt) <= self.fast_max_tokens
+        )
+        model = self.fast_model if fast else MODEL_NAME
+        self.routed[model] = self.routed.get(model, 0) + 1
+        return model
+
+    def record_latency(self, model: str, seconds: float):
+        self._latencies.setdefault(model, deque(maxlen=LLM_LATENCY_WINDOW)).append(seconds)
+
+    def hedge_delay(self, model: str):
+        """Seconds to wait before hedging a call to model, or None when hedging is off."""
+        if not self.hedge_percentile:
+            return None
+        samples = self._latencies.get(model, ())
+        if len(samples) < LLM_HEDGE_MIN_SAMPLES:
+            return LLM_HEDGE_INITIAL_SECONDS
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(len(ordered) * self.hedge_percentile / 100))
+        return max(LLM_HEDGE_MIN_SECONDS, ordered[index])
+
+    def stats(self) -> dict:
+        delays = {model: self.hedge_delay(model) for model in self._latencies}
+        return {
+            "routed": dict(self.routed),
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "hedge_delay_seconds": {model: round(delay, 3) for model, delay in delays.items() if delay},
+        }
+
+
+scheduler = LLMScheduler(LLM_MAX_CONCURRENCY, LLM_MAX_QUEUE, LLM_TIMEOUT_SECONDS)
+breaker = CircuitBreaker(
+    LLM_BREAKER_FAILURE_RATE, LLM_BREAKER_MIN_CALLS, LLM_BREAKER_WINDOW_SECONDS, LLM_BREAKER_COOLDOWN_SECONDS
+)
+router = LLMRouter(FAST_MODEL_NAME, LLM_FAST_TASKS, LLM_FAST_MAX_PROMPT_TOKENS, LLM_HEDGE_PERCENTILE)
+
+
+analysis_cache = TieredCache(
+    LRUCache(ANALYSIS_CACHE_SIZE, ttl=ANALYSIS_CACHE_TTL_SECONDS),
+    SQLiteCache(ANALYSIS_CACHE_DB, ttl=ANALYSIS_CACHE_TTL_SECONDS) if ANALYSIS_CACHE_DB else None,
+)
+analysis_flight = SingleFlight("analysis")
+keyword_flight = SingleFlight("keywords")
+
+
+def get_llm_stats() -> dict:
+    """Return current LLM scheduler, routing and circuit-breaker metrics."""
+    return {**scheduler.stats(), "router": router.stats(), "breaker": breaker.stats()}
+
+
+def get_analysis_cache_stats() -> dict:
+    """Return hit/miss counters for the analysis cache."""
+    return analysis_cache.stats()
+
+
+register_stats("llm", get_llm_stats)
+register_stats("analysis_cache", get_analysis_cache_stats)
+
+
+def _record_usage(response, prompt: str, output: str):
+    """Count tokens from Gemini's usage metadata, estimating when it is absent."""
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", 0) or estimate_tokens(prompt)
+    output_tokens = getattr(usage, "candidates_token_count", 0) or estimate_tokens(output)
+    record_tokens(prompt_tokens, output_tokens)
+
+
+def get_model(model_name: str = MODEL_NAME):
+    """Initialize and return a Gemini model (the default tier unless named)."""
+    # Imported on first use: the SDK alone accounts for about a second of cold start
+    import google.generativeai as genai
+
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         raise ValueError("GEMINI_API_KEY environment variable is not set")
     genai.configure(api_key=api_key)
-    return genai.GenerativeModel("gemini-flash-latest")
+    return genai.GenerativeModel(model_name)
 
 
-async def analyze_resume(resume_text: str, job_description: str) -> dict:
+async def _hedged(attempt, delay):
     """
-    Analyze resume against job description using Gemini.
-    Returns ATS score, matched/missing keywords, and suggestions.
+    Await attempt(); if it has not finished after delay seconds (and a
+    scheduler slot is free), start a second one and take whichever succeeds first.
+    """
+    tasks = [asyncio.ensure_future(attempt())]
+    try:
+        if delay is not None:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and scheduler.has_capacity():
+                router.hedged += 1
+                tasks.append(asyncio.ensure_future(attempt()))
+
+        pending = set(tasks)
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is not tasks[0]:
+                        router.hedge_wins += 1
+                    return task.result()
+                error = error or task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def generate_text(prompt: str, timeout: float = None, task: str = "general") -> str:
+    """
+    Run a prompt through the async Gemini API under the shared scheduler.
+    The model tier is chosen per task and prompt size; slow calls are hedged
+    with a duplicate request, and both share one deadline, covering the wait
+    for a scheduler slot, so the total time stays within the timeout.
     """
-    model = get_model()
+    model_name = router.model_for(prompt, task)
+    model = get_model(model_name)
+    breaker.before_call()
+    call_timeout = timeout or scheduler.timeout
+    deadline = time.monotonic() + call_timeout
+
+    async def call():
+        # Timed from inside the slot so queueing doesn't inflate the hedge delay
+        started = time.monotonic()
+        try:
+            response = await model.generate_content_async(
+                prompt, request_options={"timeout": max(0.1, deadline - started)}
+            )
+        except asyncio.CancelledError:
+            # A losing hedge or a timed-out call ran at least this long; leaving
+            # it out would bias the latency window towards fast calls
+            router.record_latency(model_name, time.monotonic() - started)
+            raise
+        router.record_latency(model_name, time.monotonic() - started)
+        return response
+
+    async def attempt():
+        return await scheduler.run(call, deadline=deadline)
+
+    failed = None
+    try:
+        response = await _hedged(attempt, router.hedge_delay(model_name))
+        failed = False
+    except LLMBusyError:
+        raise
+    except Exception:
+        failed = True
+        raise
+    finally:
+        breaker.record(failed)
+    text = response.text.strip()
+    _record_usage(response, prompt, text)
+    return text
+
+
+async def stream_text(prompt: str, timeout: float = None, task: str = "general"):
+    """
+    Yield Gemini output chunks as they arrive, holding one scheduler slot
+    throughout. The timeout covers waiting for the slot as well as the stream.
+    """
+    model_name = router.model_for(prompt, task)
+    model = get_model(model_name)
+    breaker.before_call()
+    call_timeout = timeout or scheduler.timeout
+    deadline = time.monotonic() + call_timeout
+
+    failed = None
+    try:
+        # Time spent queued for the slot counts against the same deadline
+        async with scheduler.slot(call_timeout):
+            try:
+                remaining = max(0.1, deadline - time.monotonic())
+                response = await asyncio.wait_for(
+                    model.generate_content_async(
+                        prompt, stream=True, request_options={"timeout": remaining}
+                    ),
+                    remaining,
+                )
+                chunks = response.__aiter__()
+                chunk, parts = None, []
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(
+                            chunks.__anext__(), max(0.0, deadline - time.monotonic())
+                        )
+                    except StopAsyncIteration:
+                        break
+                    if chunk.text:
+                        parts.append(chunk.text)
+                        yield chunk.text
+                # The final chunk carries the usage totals for the whole response
+                _record_usage(chunk, prompt, "".join(parts))
+                failed = False
+            except asyncio.TimeoutError:
+                raise LLMTimeoutError(f"LLM call timed out after {call_timeout:.0f}s")
+    except LLMBusyError:
+        raise
+    except Exception:
+        failed = True
+        raise
+    finally:
+        breaker.record(failed)
 
-    prompt = f"""You are an expert ATS (Applicant Tracking System) analyzer and career coach.
+
+def _analysis_prompt(resume_text: str, job_description: str) -> str:
+    """Build the ATS analysis prompt."""
+    return f"""You are an expert ATS (Applicant Tracking System) analyzer and career coach.
 
 Analyze the following resume against the job description and provide a detailed ATS compatibility analysis.
 
@@ -54,8 +494,10 @@ Rules:
 5. Focus on hard skills, technical skills, certifications, tools, and industry-specific terms.
 6. Return ONLY valid JSON, no other text."""
 
-    response = model.generate_content(prompt)
-    response_text = response.text.strip()
+
+def _parse_analysis(response_text: str) -> dict:
+    """Turn the raw Gemini analysis response into the API result shape."""
+    response_text = response_text.strip()
 
     # Clean up response - remove markdown fences if present
     if response_text.startswith("```"):
@@ -73,13 +515,162 @@ Rules:
     }
 
 
-async def suggest_keyword_placement(resume_content: str, keywords: list, source_type: str = "docx") -> str:
+def _suggestions_prompt(resume_text: str, job_description: str, local: dict) -> str:
+    """Build the hybrid-mode prompt: keywords are already known, ask only for advice."""
+    return f"""You are an expert ATS (Applicant Tracking System) analyzer and career coach.
+
+A keyword scan has already compared the resume below with the job description.
+Matched keywords: {', '.join(local["matched_keywords"]) or "none"}
+Missing keywords: {', '.join(local["missing_keywords"]) or "none"}
+
+RESUME:
+---
+{resume_text}
+---
+
+JOB DESCRIPTION:
+---
+{job_description}
+---
+
+Provide your answer in the following JSON format ONLY (no markdown, no code fences, just raw JSON):
+{{
+    "job_title": "<extracted job title from the description>",
+    "suggestions": [
+        "<actionable suggestion 1>",
+        "<actionable suggestion 2>",
+        ...
+    ]
+}}
+
+Rules:
+1. suggestions: Specific, actionable recommendations to improve the resume for this job. Include where to add missing keywords naturally.
+2. Do not repeat the keyword lists; focus on how to close the gaps.
+3. Return ONLY valid JSON, no other text."""
+
+
+def _parse_suggestions(response_text: str, local: dict) -> dict:
+    response_text = response_text.strip()
+    if response_text.startswith("```"):
+        lines = response_text.split("\n")
+        response_text = "\n".join(lines[1:-1])
+
+    result = json.loads(response_text)
+
+    return {
+        "ats_score": local["ats_score"],
+        "job_title": result.get("job_title", ""),
+        "matched_keywords": local["matched_keywords"],
+        "missing_keywords": local["missing_keywords"],
+        "suggestions": result.get("suggestions", []),
+    }
+
+
+def _analysis_plan(resume_text: str, job_description: str, mode: str) -> tuple:
+    """Return (prompt, finish) for a mode; prompt is None when no LLM call is needed."""
+    if mode not in ANALYSIS_MODES:
+        raise ValueError(f"Unknown analysis mode: {mode}. Use one of {', '.join(ANALYSIS_MODES)}.")
+    if mode == "llm":
+        documents = prepare_documents("analysis", resume_text=resume_text, job_description=job_description)
+        return _analysis_prompt(**documents), _parse_analysis
+
+    local = match_keywords(resume_text, job_description)
+    if mode == "hybrid":
+        documents = prepare_documents("suggestions", resume_text=resume_text, job_description=job_description)
+        prompt = _suggestions_prompt(documents["resume_text"], documents["job_description"], local)
+        return prompt, lambda response_text: _parse_suggestions(response_text, local)
+
+    return None, lambda _: {
+        "ats_score": local["ats_score"],
+        "job_title": guess_job_title(job_description),
+        "matched_keywords": local["matched_keywords"],
+        "missing_keywords": local["missing_keywords"],
+        "suggestions": keyword_suggestions(local["missing_keywords"]),
+    }
+
+
+def _analysis_cache_key(resume_text: str, job_description: str, mode: str) -> str:
+    return content_hash(
+        resume_text, job_description, ANALYSIS_PROMPT_VERSION, MODEL_NAME, FAST_MODEL_NAME, mode
+    )
+
+
+def _degraded_analysis(resume_text: str, job_description: str) -> dict:
+    """The local "fast" analysis, flagged as degraded, for when Gemini is unavailable."""
+    _, finish = _analysis_plan(resume_text, job_description, "fast")
+    return dict(finish(""), degraded=True)
+
+
+async def analyze_resume(
+    resume_text: str, job_description: str, use_cache: bool = True, mode: str = "llm"
+) -> dict:
     """
-    Use LLM to intelligently place keywords into the resume content.
-    Adapts strategy based on source_type (pdf reconstruction vs docx preservation).
+    Analyze resume against job description using Gemini.
+    Returns ATS score, matched/missing keywords, and suggestions.
+    Results are cached by a normalized hash of the inputs unless use_cache is False.
+    See ANALYSIS_MODES for the local "fast" and "hybrid" alternatives.
     """
-    model = get_model()
+    prompt, finish = _analysis_plan(resume_text, job_description, mode)
+    if prompt is None:
+        return finish("")
+
+    cache_key = _analysis_cache_key(resume_text, job_description, mode)
+    if use_cache:
+        cached = analysis_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+
+    async def run():
+        # Scoring ("llm") is the structured task routed to the fast model tier
+        analysis = finish(await generate_text(prompt, task="analysis" if mode == "llm" else "suggestions"))
+        analysis_cache.set(cache_key, analysis)
+        return analysis
 
+    # A double-clicked or retried request shares the Gemini call already in flight
+    try:
+        return dict(await analysis_flight.do(cache_key, run))
+    except LLMUnavailableError:
+        if not LLM_DEGRADED_FALLBACK:
+            raise
+        return _degraded_analysis(resume_text, job_description)
+
+
+async def stream_analyze_resume(
+    resume_text: str, job_description: str, use_cache: bool = True, mode: str = "llm"
+):
+    """
+    Streaming variant of analyze_resume.
+    Yields ("token", text) for each Gemini chunk, then ("result", analysis).
+    """
+    prompt, finish = _analysis_plan(resume_text, job_description, mode)
+    if prompt is None:
+        yield "result", finish("")
+        return
+
+    cache_key = _analysis_cache_key(resume_text, job_description, mode)
+    if use_cache:
+        cached = analysis_cache.get(cache_key)
+        if cached is not None:
+            yield "result", dict(cached)
+            return
+
+    parts = []
+    try:
+        async for text in stream_text(prompt, task="analysis" if mode == "llm" else "suggestions"):
+            parts.append(text)
+            yield "token", text
+    except LLMUnavailableError:
+        if not LLM_DEGRADED_FALLBACK:
+            raise
+        yield "result", _degraded_analysis(resume_text, job_description)
+        return
+    analysis = finish("".join(parts))
+    analysis_cache.set(cache_key, analysis)
+    yield "result", dict(analysis)
+
+
+def _keyword_prompt(resume_content: str, keywords: list, source_type: str) -> str:
+    """Build the keyword placement prompt for the given source type."""
     if source_type == "pdf":
         # Strategy for PDFs: Reconstruction into professional HTML
         prompt = f"""You are an expert resume writer. 
@@ -125,10 +716,13 @@ Rules:
 4. DO NOT use markdown characters like *, **, or _ for formatting. Maintain the original HTML formatting only.
 5. Focus on maintaining the exact layout provided.
 6. Return ONLY the modified HTML, no explanations or code fences."""
+    return prompt
+
+
+def _clean_html_response(response_text: str) -> str:
+    """Strip markdown artifacts and code fences from Gemini's HTML output."""
+    response_text = response_text.strip()
 
-    response = model.generate_content(prompt)
-    response_text = response.text.strip()
-    
     # Sanitize: Remove common markdown bold/italic symbols that the AI might still inject
     response_text = response_text.replace("**", "").replace("__", "")
     
@@ -142,3 +736,141 @@ Rules:
             response_text = "\n".join(lines[1:-1])
 
     return response_text.strip()
+
+
+def _compact_resume(resume_content: str, source_type: str) -> tuple:
+    """
+    Shrink the resume for a rewrite prompt without losing anything: PDF text
+    gets its whitespace normalized, HTML its attributes aliased. Returns the
+    compact content and a function restoring the model's output.
+    """
+    if source_type == "pdf":
+        compact, restore = normalize_whitespace(resume_content), lambda html: html
+    else:
+        compact, aliases = compact_html(resume_content)
+        restore = lambda html: expand_html(html, aliases)
+    log_compaction("keywords", estimate_tokens(resume_content), estimate_tokens(compact))
+    return compact, restore
+
+
+def _section_keyword_prompt(section: dict, keywords: list) -> str:
+    """Prompt for rewriting one section of an HTML resume."""
+    heading = section["heading"] or "the top of the resume"
+    return f"""You are an expert resume writer. 
+
+Below is ONE SECTION ({heading}) of an HTML resume. Modify it to naturally incorporate the keywords while STRICTLY PRESERVING its structure and formatting.
+
+SECTION HTML:
+---
+{section["html"]}
+---
+
+KEYWORDS TO ADD:
+{', '.join(keywords)}
+
+Rules:
+1. Return the SAME HTML fragment with the keywords added. Do not add headings, wrapper tags or content from other sections.
+2. Do NOT remove any existing tags, styles, or classes.
+3. Add keywords naturally as PLAIN TEXT into existing bullet points, skill lists, or descriptions.
+4. DO NOT use markdown characters like *, **, or _ for formatting. Maintain the original HTML formatting only.
+5. Return ONLY the modified HTML fragment, no explanations or code fences."""
+
+
+def _keyword_section_plan(resume_content: str, keywords: list, source_type: str):
+    """
+    Sections and their assigned keywords when the resume is long enough to
+    rewrite piecewise, else None. PDF text is reconstructed as a whole.
+    """
+    if source_type == "pdf" or len(resume_content) < KEYWORD_SECTION_MIN_CHARS:
+        return None
+    sections = split_sections(resume_content)
+    if len(sections) < 2:
+        return None
+    return sections, assign_keywords(sections, keywords)
+
+
+async def _rewrite_section(section: dict, keywords: list) -> str:
+    compact, restore = _compact_resume(section["html"], "docx")
+    response_text = await generate_text(
+        _section_keyword_prompt(dict(section, html=compact), keywords), task="section"
+    )
+    rewritten = restore(_clean_html_response(response_text))
+    # Keep the section's surrounding whitespace so the splice stays faithful
+    leading = section["html"][: len(section["html"]) - len(section["html"].lstrip())]
+    trailing = section["html"][len(section["html"].rstrip()):]
+    return leading + rewritten + trailing
+
+
+async def suggest_keyword_placement(resume_content: str, keywords: list, source_type: str = "docx") -> str:
+    """
+    Use LLM to intelligently place keywords into the resume content.
+    Adapts strategy based on source_type (pdf reconstruction vs docx preservation).
+    Long HTML resumes only have the sections relevant to the keywords
+    rewritten, concurrently, and spliced back into the untouched HTML.
+    Identical concurrent calls share one rewrite.
+    """
+    key = content_hash(resume_content, json.dumps(keywords), source_type, MODEL_NAME)
+    return await keyword_flight.do(
+        key, lambda: _place_keywords(resume_content, keywords, source_type)
+    )
+
+
+async def _place_keywords(resume_content: str, keywords: list, source_type: str) -> str:
+    plan = _keyword_section_plan(resume_content, keywords, source_type)
+    if plan is None:
+        compact, restore = _compact_resume(resume_content, source_type)
+        response_text = await generate_text(_keyword_prompt(compact, keywords, source_type), task="keywords")
+        return restore(_clean_html_response(response_text))
+
+    sections, assigned = plan
+    indexes = sorted(assigned)
+    rewritten = await asyncio.gather(
+        *(_rewrite_section(sections[i], assigned[i]) for i in indexes)
+    )
+    replaced = dict(zip(indexes, rewritten))
+    return "".join(replaced.get(i, section["html"]) for i, section in enumerate(sections)).strip()
+
+
+async def stream_keyword_placement(resume_content: str, keywords: list, source_type: str = "docx"):
+    """
+    Streaming variant of suggest_keyword_placement.
+    Yields ("token", html_chunk) as the rewrite is generated, then
+    ("result", cleaned_html). Chunks are held back while a tag is still open
+    so its aliased attributes (see compact_html) can be expanded first.
+    Section-wise rewrites yield ("section", {"index", "html"}) as each section
+    finishes instead of tokens.
+    """
+    plan = _keyword_section_plan(resume_content, keywords, source_type)
+    if plan is not None:
+        sections, assigned = plan
+
+        async def rewrite(index):
+            return index, await _rewrite_section(sections[index], assigned[index])
+
+        tasks = [asyncio.ensure_future(rewrite(index)) for index in sorted(assigned)]
+        replaced = {}
+        try:
+            for finished in asyncio.as_completed(tasks):
+                index, html = await finished
+                replaced[index] = html
+                yield "section", {"index": index, "html": html}
+        finally:
+            for task in tasks:
+                task.cancel()
+        yield "result", "".join(replaced.get(i, section["html"]) for i, section in enumerate(sections)).strip()
+        return
+
+    parts = []
+    pending = ""
+    compact, restore = _compact_resume(resume_content, source_type)
+    async for text in stream_text(_keyword_prompt(compact, keywords, source_type), task="keywords"):
+        parts.append(text)
+        pending += text
+        opened = pending.rfind("<")
+        cut = len(pending) if opened <= pending.rfind(">") else opened
+        if cut:
+            yield "token", restore(pending[:cut])
+            pending = pending[cut:]
+    if pending:
+        yield "token", restore(pending)
+    yield "result", restore(_clean_html_response("".join(parts)))
@@ -0,0 +1,146 @@
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Upper bounds (seconds) shared by every latency histogram
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Stage -> seconds spent in the current request; set per request by the timing middleware
+_request_timings: ContextVar = ContextVar("request_timings", default=None)
+
+
+def _label_text(labels: tuple) -> str:
+    return ",".join(f'{name}="{value}"' for name, value in labels)
+
+
+class Histogram:
+    """Prometheus-style cumulative histogram keyed by label values."""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple, buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        labels = tuple(zip(self.label_names, label_values))
+        with self._lock:
+            counts, total = self._series.get(labels, ([0] * (len(self.buckets) + 1), 0.0))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            counts[-1] += 1
+            self._series[labels] = (counts, total + value)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted(self._series.items())
+        for labels, (counts, total) in series:
+            prefix = _label_text(labels)
+            separator = "," if prefix else ""
+            for bound, count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{prefix}{separator}le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{prefix}{separator}le="+Inf"}} {counts[-1]}')
+            lines.append(f"{self.name}_sum{{{prefix}}} {total}")
+            lines.append(f"{self.name}_count{{{prefix}}} {counts[-1]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float, *label_values):
+        labels = tuple(zip(self.label_names, label_values))
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        lines.extend(f"{self.name}{{{_label_text(labels)}}} {value}" for labels, value in values)
+        return lines
+
+
+stage_seconds = Histogram(
+    "resume_stage_duration_seconds", "Time spent per processing stage.", ("stage",)
+)
+request_seconds = Histogram(
+    "resume_http_request_duration_seconds", "HTTP request latency.", ("method", "route", "status")
+)
+llm_tokens = Counter("resume_llm_tokens_total", "Gemini tokens by direction.", ("kind",))
+
+_INVALID_METRIC_CHARS = re.compile(r"[^a-zA-Z0-9_:]")
+
+# Name -> zero-argument callable returning a stats dict, read at scrape time
+_stats_sources = {}
+
+
+def register_stats(name: str, source):
+    """Expose a component's stats() numbers as gauges on /api/metrics."""
+    _stats_sources[name] = source
+
+
+def observe(stage: str, seconds: float):
+    """Record a stage duration in the histogram and the current request's Server-Timing."""
+    stage_seconds.observe(seconds, stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def timed(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - started)
+
+
+def record_tokens(prompt_tokens: int, output_tokens: int):
+    llm_tokens.inc(prompt_tokens, "prompt")
+    llm_tokens.inc(output_tokens, "output")
+
+
+def start_request() -> dict:
+    """Begin collecting stage timings for the current request; returns the dict being filled."""
+    timings = {}
+    _request_timings.set(timings)
+    return timings
+
+
+def server_timing(timings: dict, total: float) -> str:
+    entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def _flatten(prefix: str, stats: dict):
+    for key, value in stats.items():
+        # Keys can be model or file names; metric names only allow [a-zA-Z0-9_:]
+        name = f"{prefix}_{_INVALID_METRIC_CHARS.sub('_', str(key))}"
+        if isinstance(value, dict):
+            yield from _flatten(name, value)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, value
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines = stage_seconds.render() + request_seconds.render() + llm_tokens.render()
+    for name, source in _stats_sources.items():
+        for metric, value in _flatten(f"resume_{name}", source()):
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value}")
+    return "\n".join(lines) + "\n"
@@ -1,51 +1,494 @@
-import pdfplumber
-import mammoth
-from docx import Document
 from io import BytesIO
 from fastapi import UploadFile
+from html.parser import HTMLParser
+from api.services.cache import LRUCache
+from api.services.workers import WorkerPool, WorkerTimeoutError, WorkerCrashedError
+from api.services.metrics import timed, register_stats
+from api.services.singleflight import SingleFlight
+import asyncio
+import hashlib
+import os
 import re
+import shutil
+import tempfile
+import threading
 
 
-async def parse_file(file: UploadFile) -> tuple:
-    """Parse uploaded file (PDF or DOCX) and return (text, html, source_type)."""
-    content = await file.read()
-    filename = file.filename.lower() if file.filename else ""
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+PARSE_TIMEOUT_SECONDS = float(os.getenv("PARSE_TIMEOUT_SECONDS", "30"))
+PARSE_MEMORY_LIMIT_MB = int(os.getenv("PARSE_MEMORY_LIMIT_MB", "1024"))
+PDF_PAGES_PER_JOB = int(os.getenv("PDF_PAGES_PER_JOB", "3"))
+# "fast" reads the PDF text layer directly (pdfium) and only runs pdfplumber's
+# layout analysis on pages that come out garbled; "layout" always uses pdfplumber.
+PDF_EXTRACTION = os.getenv("PDF_EXTRACTION", "fast")
+# Extraction stops after this many pages / characters (0 = no limit)
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "10"))
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "50000"))
+PARSE_CACHE_SIZE = int(os.getenv("PARSE_CACHE_SIZE", "128"))
+UPLOAD_MAX_MB = float(os.getenv("UPLOAD_MAX_MB", "10"))
+# Whole multipart requests (batch uploads carry several files) are refused above this
+UPLOAD_MAX_REQUEST_MB = float(os.getenv("UPLOAD_MAX_REQUEST_MB", "64"))
+# Uploads up to this size stay in memory; larger ones are spooled to a temp file
+UPLOAD_SPOOL_KB = int(os.getenv("UPLOAD_SPOOL_KB", "1024"))
+UPLOAD_CHUNK_BYTES = 64 * 1024
+
+# Leading bytes every file of the type starts with (DOCX is a zip archive)
+MAGIC_NUMBERS = {"pdf": b"%PDF-", "docx": b"PK\x03\x04"}
+
+parse_pool = WorkerPool(
+    "parse", PARSE_WORKERS, PARSE_TIMEOUT_SECONDS, memory_limit_mb=PARSE_MEMORY_LIMIT_MB
+)
+parse_cache = LRUCache(PARSE_CACHE_SIZE)
+parse_flight = SingleFlight("parse")
+# pdfium is not thread-safe; parse jobs run in threads when PARSE_WORKERS=0
+_pdfium_lock = threading.RLock()
+# pdfplumber, pypdfium2 and mammoth are imported on first use (in the parse
+# workers), keeping them off the API's cold-start path
+_pdfium = None
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds UPLOAD_MAX_MB."""
+
+
+def get_parse_cache_stats() -> dict:
+    """Return hit/miss counters for the parse-result cache."""
+    return parse_cache.stats()
+
+
+def shutdown_parse_pool():
+    """Stop the parse workers; called on application shutdown."""
+    parse_pool.shutdown()
+
+
+def get_parse_pool_stats() -> dict:
+    return parse_pool.stats()
 
+
+register_stats("parse_cache", get_parse_cache_stats)
+register_stats("parse_pool", get_parse_pool_stats)
+
+
+async def _run_parse_job(func, *args):
+    """Run a parse function in the worker pool with a hard wall-clock limit."""
+    try:
+        return await parse_pool.run(func, *args)
+    except WorkerTimeoutError:
+        raise ValueError(
+            f"Parsing the uploaded file took longer than {parse_pool.timeout:.0f}s. "
+            "Please upload a simpler PDF or DOCX file."
+        )
+    except WorkerCrashedError:
+        raise ValueError(
+            "The uploaded file could not be parsed within the memory limit. "
+            "Please upload a smaller PDF or DOCX file."
+        )
+
+
+def _source_type(filename: str, head: bytes) -> str:
+    """File type from the extension, checked against the file's magic number."""
+    filename = filename.lower() if filename else ""
     if filename.endswith(".pdf"):
-        text = parse_pdf(content)
-        # Convert plain text to simple HTML for the editor
-        html = "".join([f"<p>{line}</p>" for line in text.split("\n\n") if line.strip()])
-        return text, html, "pdf"
+        source_type = "pdf"
     elif filename.endswith(".docx"):
-        text, html = parse_docx(content)
-        return text, html, "docx"
+        source_type = "docx"
     else:
         raise ValueError(f"Unsupported file format: {filename}. Please upload a PDF or DOCX file.")
 
+    magic = MAGIC_NUMBERS[source_type]
+    # PDF readers accept a header anywhere in the first KB, so allow leading junk there
+    found = magic in head[:1024] if source_type == "pdf" else head.startswith(magic)
+    if not found:
+        raise ValueError(f"{filename} does not look like a {source_type.upper()} file.")
+    return source_type
 
-def parse_pdf(content: bytes) -> str:
-    """Extract text from PDF bytes."""
+
+def _too_large(filename: str) -> UploadTooLargeError:
+    return UploadTooLargeError(
+        f"{filename or 'The upload'} is larger than the {UPLOAD_MAX_MB:g} MB limit."
+    )
+
+
+class SpooledUpload:
+    """
+    An upload copied in chunks, with its type, size and SHA-256. Small files
+    stay in memory; larger ones live in a temp file that parse workers read
+    by path, so the content is never pickled across processes. Call close()
+    (or use as a context manager) to remove the temp file.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.source_type = None
+        self.size = 0
+        self._digest = hashlib.sha256()
+        self._buffer = bytearray()
+        self._file = None
+
+    @property
+    def sha256(self) -> str:
+        return self._digest.hexdigest()
+
+    def write(self, chunk: bytes):
+        if self.source_type is None:
+            self.source_type = _source_type(self.filename, chunk)
+        self.size += len(chunk)
+        if self.size > UPLOAD_MAX_MB * 1024 * 1024:
+            raise _too_large(self.filename)
+        self._digest.update(chunk)
+        if self._file is None and self.size > UPLOAD_SPOOL_KB * 1024:
+            self._file = tempfile.NamedTemporaryFile(suffix=f".{self.source_type}", delete=False)
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+        if self._file is not None:
+            self._file.write(chunk)
+        else:
+            self._buffer.extend(chunk)
+
+    def source(self):
+        """The bytes of a small upload, or the temp file path of a spooled one."""
+        if self._file is None:
+            return bytes(self._buffer)
+        self._file.flush()
+        return self._file.name
+
+    def read(self) -> bytes:
+        """The whole upload as bytes."""
+        source = self.source()
+        if isinstance(source, bytes):
+            return source
+        with open(source, "rb") as spooled:
+            return spooled.read()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            try:
+                os.unlink(self._file.name)
+            except OSError:
+                pass
+            self._file = None
+        self._buffer = bytearray()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+async def spool_upload(file: UploadFile) -> SpooledUpload:
+    """
+    Copy an upload in chunks, rejecting it as soon as its first bytes show
+    the wrong type or its size passes UPLOAD_MAX_MB.
+    """
+    if file.size is not None and file.size > UPLOAD_MAX_MB * 1024 * 1024:
+        raise _too_large(file.filename)
+    upload = SpooledUpload(file.filename)
+    try:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            upload.write(chunk)
+        if upload.source_type is None:
+            raise ValueError("The uploaded file is empty.")
+    except Exception:
+        upload.close()
+        raise
+    return upload
+
+
+async def parse_file(file: UploadFile) -> tuple:
+    """Parse uploaded file (PDF or DOCX) and return (text, html, source_type)."""
+    with await spool_upload(file) as upload:
+        return await parse_upload(upload)
+
+
+async def parse_upload(upload: SpooledUpload) -> tuple:
+    """Parse a spooled upload; results are cached by content hash."""
+    return await _parse_cached(upload.source_type, upload.sha256, upload.source)
+
+
+async def parse_content(content: bytes, filename: str) -> tuple:
+    """Parse already-read upload bytes; the file type is taken from filename."""
+    if len(content) > UPLOAD_MAX_MB * 1024 * 1024:
+        raise _too_large(filename)
+    source_type = _source_type(filename, content[:1024])
+    return await _parse_cached(source_type, hashlib.sha256(content).hexdigest(), lambda: content)
+
+
+async def _parse_cached(source_type: str, sha256: str, get_source) -> tuple:
+    # The same resume is uploaded once per job description, so reuse earlier parses.
+    cache_key = f"{source_type}:{sha256}"
+    cached = parse_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    async def parse(source):
+        with timed("parse"):
+            if source_type == "pdf":
+                text = await parse_pdf_async(source)
+                # Convert plain text to simple HTML for the editor
+                html = "".join([f"<p>{line}</p>" for line in text.split("\n\n") if line.strip()])
+            else:
+                text, html = await _run_parse_job(parse_docx, source)
+
+        result = (text, html, source_type)
+        parse_cache.set(cache_key, result)
+        return result
+
+    def start():
+        # The factory runs synchronously for the caller that starts it, so the
+        # shared task claims its own copy of the input before that caller can
+        # go away and delete it. The copy is released when the task is done,
+        # including when it is cancelled before it ever runs.
+        source = _claim_source(get_source())
+        task = asyncio.ensure_future(parse(source))
+        task.add_done_callback(lambda _: _release_source(source))
+        return task
+
+    # Concurrent uploads of the same file share one parse
+    return await parse_flight.do(cache_key, start)
+
+
+def _claim_source(source):
+    """
+    Input the shared parse task owns: bytes as they are, a spooled file as a
+    private hard link (or copy) that outlives the caller's spool.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        return source
+    fd, owned = tempfile.mkstemp(suffix=os.path.splitext(source)[1])
+    os.close(fd)
+    os.unlink(owned)
+    try:
+        os.link(source, owned)
+    except OSError:
+        shutil.copyfile(source, owned)
+    return owned
+
+
+def _release_source(source):
+    if isinstance(source, str):
+        try:
+            os.unlink(source)
+        except OSError:
+            pass
+
+
+def _open_source(source):
+    """A readable file for upload bytes or a spooled upload's path."""
+    return BytesIO(source) if isinstance(source, (bytes, bytearray)) else open(source, "rb")
+
+
+async def parse_pdf_async(content) -> str:
+    """
+    Extract PDF text in the worker pool, splitting long documents across workers.
+    content is the PDF bytes or the path of a spooled upload. Pages past
+    PDF_MAX_PAGES, or after PDF_MAX_CHARS of text, are never read: chunks are
+    submitted one wave (a job per worker) at a time until the budget is met.
+    """
+    last_page = PDF_MAX_PAGES or None
+    first_end = min(PDF_PAGES_PER_JOB, last_page) if last_page else PDF_PAGES_PER_JOB
+    page_count, first_parts = await _run_parse_job(
+        _parse_pdf_pages, content, 0, first_end, PDF_MAX_CHARS, True
+    )
+    text_parts = list(first_parts)
+    remaining = PDF_MAX_CHARS - sum(len(part) for part in text_parts) if PDF_MAX_CHARS else 0
+
+    last_page = min(page_count, last_page) if last_page else page_count
+    starts = list(range(first_end, last_page, PDF_PAGES_PER_JOB))
+    wave_size = max(1, parse_pool.workers)
+    for wave in range(0, len(starts), wave_size):
+        if PDF_MAX_CHARS and remaining <= 0:
+            break
+        chunks = [
+            _run_parse_job(
+                _parse_pdf_pages, content, start, min(start + PDF_PAGES_PER_JOB, last_page), remaining
+            )
+            for start in starts[wave:wave + wave_size]
+        ]
+        # gather preserves submission order, so pages are merged back in sequence.
+        for _, parts in await asyncio.gather(*chunks):
+            for part in parts:
+                if PDF_MAX_CHARS and remaining <= 0:
+                    break
+                text_parts.append(part)
+                if PDF_MAX_CHARS:
+                    remaining -= len(part)
+    return "\n\n".join(text_parts)
+
+
+def _looks_garbled(text: str) -> bool:
+    """Heuristic for text-layer output that needs pdfplumber's layout analysis instead."""
+    if not text.strip():
+        return True
+    letters = sum(char.isalnum() for char in text)
+    if letters < len(text) * 0.4:
+        return True
+    bad = text.count("\ufffd") + text.count("(cid:") + sum(
+        1 for char in text if ord(char) < 32 and char not in "\n\t"
+    )
+    if bad > len(text) * 0.01:
+        return True
+    # Missing inter-word spacing shows up as implausibly long "words"
+    words = text.split()
+    return sum(len(word) for word in words) / len(words) > 20
+
+
+def _load_pdfium():
+    """The pypdfium2 module, or None when it is not installed."""
+    global _pdfium
+    if _pdfium is None:
+        try:
+            import pypdfium2
+        except ImportError:
+            pypdfium2 = False
+        _pdfium = pypdfium2
+    return _pdfium or None
+
+
+def _pdfium_pages(content, start: int, end: int):
+    """Yield (index, text) from the PDF text layer without layout analysis."""
+    pypdfium2 = _load_pdfium()
+    with _pdfium_lock:
+        document = pypdfium2.PdfDocument(content)
+    try:
+        for index in range(start, min(end, len(document))):
+            with _pdfium_lock:
+                page = document[index]
+                textpage = page.get_textpage()
+                text = textpage.get_text_range()
+                textpage.close()
+                page.close()
+            yield index, text.replace("\r\n", "\n").strip()
+    finally:
+        with _pdfium_lock:
+            document.close()
+
+
+def _open_layout(content):
+    """Open a PDF (bytes or path) with pdfplumber for layout-aware extraction."""
+    import pdfplumber
+
+    return pdfplumber.open(content if isinstance(content, str) else BytesIO(content))
+
+
+def iter_pdf_pages(content, start: int = 0, end: int = None, mode: str = None):
+    """
+    Lazily yield page texts for pages [start, end). In "fast" mode pages
+    whose text layer looks garbled are re-read with full layout analysis.
+    """
+    mode = mode or PDF_EXTRACTION
+    end = end if end is not None else float("inf")
+    layout_pdf = None
+
+    def layout_text(index):
+        nonlocal layout_pdf
+        if layout_pdf is None:
+            layout_pdf = _open_layout(content)
+        return layout_pdf.pages[index].extract_text() or ""
+
+    try:
+        if mode == "fast" and _load_pdfium() is not None:
+            for index, text in _pdfium_pages(content, start, end):
+                yield layout_text(index) if _looks_garbled(text) else text
+        else:
+            layout_pdf = _open_layout(content)
+            for page in layout_pdf.pages[start:None if end == float("inf") else end]:
+                yield page.extract_text() or ""
+    finally:
+        if layout_pdf is not None:
+            layout_pdf.close()
+
+
+def pdf_page_count(content) -> int:
+    pypdfium2 = _load_pdfium()
+    if pypdfium2 is not None:
+        with _pdfium_lock:
+            document = pypdfium2.PdfDocument(content)
+            try:
+                return len(document)
+            finally:
+                document.close()
+    with _open_layout(content) as pdf:
+        return len(pdf.pages)
+
+
+def _parse_pdf_pages(content, start: int, end: int, max_chars: int = 0, count_pages: bool = False) -> tuple:
+    """
+    Extract text from pages [start, end), stopping once max_chars is reached;
+    returns (total_pages, page_texts), total_pages being None unless count_pages.
+    """
     text_parts = []
-    with pdfplumber.open(BytesIO(content)) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text()
+    characters = 0
+    pages = iter_pdf_pages(content, start, end)
+    try:
+        for page_text in pages:
             if page_text:
                 text_parts.append(page_text)
+                characters += len(page_text)
+            if max_chars and characters >= max_chars:
+                break
+    finally:
+        pages.close()
+    return (pdf_page_count(content) if count_pages else None), text_parts
+
+
+def parse_pdf(content: bytes) -> str:
+    """Extract text from PDF bytes."""
+    _, text_parts = _parse_pdf_pages(content, 0, PDF_MAX_PAGES or None, PDF_MAX_CHARS)
     return "\n\n".join(text_parts)
 
 
-def parse_docx(content: bytes) -> tuple:
-    """Extract text and HTML from DOCX bytes."""
-    buffer = BytesIO(content)
-    
+class _BlockTextExtractor(HTMLParser):
+    """Collect the text of each block-level element from mammoth's HTML."""
+
+    BLOCK_TAGS = {"p", "h1", "h2", "h3", "h4", "h5", "h6", "li", "td", "th"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks = []
+        self._current = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.BLOCK_TAGS:
+            self._flush()
+        elif tag == "br":
+            self._current.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.BLOCK_TAGS:
+            self._flush()
+
+    def handle_data(self, data):
+        self._current.append(data)
+
+    def _flush(self):
+        block = "".join(self._current).strip()
+        if block:
+            self.blocks.append(block)
+        self._current = []
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def parse_docx(content) -> tuple:
+    """Extract text and HTML from DOCX bytes (or a path) in a single pass over the document."""
+    import mammoth
+
     # Get HTML using mammoth (much better for structure preservation)
-    result = mammoth.convert_to_html(buffer)
+    with _open_source(content) as docx_file:
+        result = mammoth.convert_to_html(docx_file)
     html = result.value
-    
-    # Get plain text for analysis
-    buffer.seek(0)
-    doc = Document(buffer)
-    text_parts = [p.text for p in doc.paragraphs if p.text.strip()]
-    text = "\n\n".join(text_parts)
-    
+
+    # Derive plain text for analysis from the same HTML instead of re-reading the DOCX
+    extractor = _BlockTextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    text = "\n\n".join(extractor.blocks)
+
     return text, html
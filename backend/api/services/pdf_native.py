@@ -0,0 +1,200 @@
+from functools import lru_cache
+from html.parser import HTMLParser
+from io import BytesIO
+from xml.sax.saxutils import escape
+import re
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT, TA_RIGHT
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import cm
+from reportlab.platypus import HRFlowable, Paragraph, SimpleDocTemplate
+
+
+class UnsupportedHTML(ValueError):
+    """Raised when the HTML uses something the native renderer doesn't handle."""
+
+
+BLOCK_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6", "p", "li"}
+INLINE_TAGS = {
+    "strong": "b", "b": "b", "em": "i", "i": "i", "u": "u",
+    "s": "strike", "strike": "strike", "sup": "super", "sub": "sub",
+}
+# Wrappers that carry no formatting of their own
+TRANSPARENT_TAGS = {"span", "html", "body", "main"}
+SECTION_TAGS = {"div", "section", "article", "header", "footer"}
+
+ALIGNMENTS = {"left": TA_LEFT, "center": TA_CENTER, "right": TA_RIGHT, "justify": TA_JUSTIFY}
+LINK_COLOR = "#2563eb"
+
+
+@lru_cache(maxsize=None)
+def _base_styles() -> dict:
+    """Paragraph styles mirroring the xhtml2pdf stylesheet, built once per process."""
+    body = ParagraphStyle(
+        "body", fontName="Helvetica", fontSize=11, leading=16.5,
+        textColor=colors.HexColor("#333333"), spaceBefore=4, spaceAfter=4,
+    )
+    return {
+        "p": body,
+        "h1": ParagraphStyle(
+            "h1", parent=body, fontName="Helvetica-Bold", fontSize=20, leading=24,
+            textColor=colors.HexColor("#1a1a1a"), spaceBefore=0, spaceAfter=2,
+        ),
+        "h2": ParagraphStyle(
+            "h2", parent=body, fontName="Helvetica-Bold", fontSize=14, leading=18,
+            textColor=colors.HexColor("#1e40af"), spaceBefore=12, spaceAfter=2,
+        ),
+        "h3": ParagraphStyle(
+            "h3", parent=body, fontName="Helvetica-Bold", fontSize=12, leading=15,
+            spaceBefore=8, spaceAfter=2,
+        ),
+        "li": ParagraphStyle("li", parent=body, spaceBefore=2, spaceAfter=2),
+    }
+
+
+@lru_cache(maxsize=None)
+def _style(tag: str, alignment: str = "left", depth: int = 0) -> ParagraphStyle:
+    """Style variant for a tag, alignment and list depth (memoized)."""
+    base = _base_styles()
+    parent = base.get(tag) or (base["h3"] if tag in ("h4", "h5", "h6") else base["p"])
+    overrides = {"alignment": ALIGNMENTS.get(alignment, TA_LEFT)}
+    if tag == "li":
+        overrides["leftIndent"] = 20 * depth
+        overrides["bulletIndent"] = 20 * depth - 10
+    return ParagraphStyle(f"{tag}-{alignment}-{depth}", parent=parent, **overrides)
+
+
+def _alignment(attrs: dict) -> str:
+    match = re.search(r"text-align\s*:\s*(\w+)", attrs.get("style") or "")
+    return match.group(1).lower() if match else "left"
+
+
+class _FlowableBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.flowables = []
+        self._block = None  # (tag, alignment, bullet, markup parts)
+        self._inline = []  # open inline tags as (open_markup, close_markup)
+        self._lists = []  # stack of [kind, counter]
+
+    # Blocks
+
+    def _start_block(self, tag: str, alignment: str = "left", bullet: str = None):
+        self._flush()
+        self._block = (tag, alignment, bullet, [opening for opening, _ in self._inline])
+
+    def _flush(self):
+        if self._block is None:
+            return
+        tag, alignment, bullet, parts = self._block
+        self._block = None
+        parts.extend(closing for _, closing in reversed(self._inline))
+        markup = re.sub(r"\s+", " ", "".join(parts)).strip()
+        if not re.sub(r"<[^>]+>", "", markup).strip():
+            return
+        style = _style(tag, alignment, len(self._lists) if tag == "li" else 0)
+        try:
+            self.flowables.append(Paragraph(markup, style, bulletText=bullet))
+        except ValueError as e:
+            raise UnsupportedHTML(f"reportlab could not lay out paragraph: {e}")
+        if tag == "h1":
+            self.flowables.append(HRFlowable(width="100%", thickness=2, color=colors.HexColor(LINK_COLOR), spaceAfter=6))
+        elif tag == "h2":
+            self.flowables.append(HRFlowable(width="100%", thickness=1, color=colors.HexColor("#dddddd"), spaceAfter=4))
+
+    def _append(self, markup: str):
+        if self._block is None:
+            self._start_block("p")
+        self._block[3].append(markup)
+
+    # HTMLParser callbacks
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag in ("ul", "ol"):
+            self._flush()
+            self._lists.append([tag, 0])
+        elif tag == "li":
+            bullet = "•"
+            if self._lists:
+                self._lists[-1][1] += 1
+                if self._lists[-1][0] == "ol":
+                    bullet = f"{self._lists[-1][1]}."
+            self._start_block("li", _alignment(attrs), bullet)
+        elif tag in BLOCK_TAGS:
+            self._start_block(tag, _alignment(attrs))
+        elif tag in INLINE_TAGS:
+            element = INLINE_TAGS[tag]
+            self._inline.append((f"<{element}>", f"</{element}>"))
+            if self._block is not None:
+                self._block[3].append(f"<{element}>")
+        elif tag == "a":
+            href = attrs.get("href")
+            if href:
+                opening = f'<a href="{escape(href, {chr(34): "&quot;"})}" color="{LINK_COLOR}">'
+                self._inline.append((opening, "</a>"))
+                if self._block is not None:
+                    self._block[3].append(opening)
+            else:
+                # mammoth emits <a id="..."> bookmarks; they render as nothing
+                self._inline.append(("", ""))
+        elif tag == "br":
+            self._append("<br/>")
+        elif tag == "hr":
+            self._flush()
+            self.flowables.append(HRFlowable(width="100%", thickness=1, color=colors.HexColor("#dddddd")))
+        elif tag in SECTION_TAGS:
+            self._flush()
+        elif tag not in TRANSPARENT_TAGS:
+            raise UnsupportedHTML(f"<{tag}> is not supported by the native PDF renderer")
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in ("br", "hr"):
+            self.handle_starttag(tag, attrs)
+        elif tag not in TRANSPARENT_TAGS and tag != "a":
+            raise UnsupportedHTML(f"<{tag}/> is not supported by the native PDF renderer")
+
+    def handle_endtag(self, tag):
+        if tag in ("ul", "ol"):
+            self._flush()
+            if self._lists:
+                self._lists.pop()
+        elif tag in BLOCK_TAGS or tag in SECTION_TAGS:
+            self._flush()
+        elif (tag in INLINE_TAGS or tag == "a") and self._inline:
+            _, closing = self._inline.pop()
+            if self._block is not None and closing:
+                self._block[3].append(closing)
+
+    def handle_data(self, data):
+        if self._block is None and not data.strip():
+            return
+        self._append(escape(data))
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def render_pdf_native(html_content: str) -> bytes:
+    """
+    Render HTML straight to PDF bytes with reportlab flowables.
+    Handles the subset mammoth and the editor produce (headings, paragraphs,
+    lists, bold/italic, links); anything else raises UnsupportedHTML so the
+    caller can fall back to xhtml2pdf.
+    """
+    builder = _FlowableBuilder()
+    builder.feed(html_content)
+    builder.close()
+    if not builder.flowables:
+        raise UnsupportedHTML("No renderable content")
+
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, pagesize=A4,
+        leftMargin=1.5 * cm, rightMargin=1.5 * cm, topMargin=1.5 * cm, bottomMargin=1.5 * cm,
+    )
+    doc.build(builder.flowables)
+    return buffer.getvalue()
@@ -0,0 +1,171 @@
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+# Rough input-token ceiling for the documents interpolated into one prompt (0 disables)
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "12000"))
+# Gemini averages about four characters of English per token
+CHARS_PER_TOKEN = 4
+
+# Job-posting sections that never carry requirements
+BOILERPLATE_HEADINGS = re.compile(
+    r"^(benefits|perks|what we offer|why (join|work)|compensation|salary|"
+    r"equal (employment )?opportunity|eeo|diversity|accommodations?|privacy|"
+    r"how to apply|about (the company|us))\b",
+    re.I,
+)
+# Paragraphs dropped wherever they appear
+BOILERPLATE_PARAGRAPHS = re.compile(
+    r"equal opportunity employer|without regard to (race|sex|age)|"
+    r"reasonable accommodation|e-verify|protected veteran|"
+    r"sexual orientation|gender identity|applicant privacy|"
+    r"recruitment agencies|unsolicited resumes",
+    re.I,
+)
+# Headings that start a section worth keeping
+SECTION_HEADINGS = re.compile(
+    r"^(responsibilities|requirements|qualifications|skills|about the (role|job|team)|"
+    r"what you('ll| will) (do|bring)|nice to have|preferred|experience|the role|role)\b",
+    re.I,
+)
+
+_HEADING_TAIL = re.compile(r"(\s+[\w&/'-]+){0,2}\s*")
+_BULLET = re.compile(r"\s*([-*+\u2022\u25aa\u25e6\u00b7]|\d+[.)])\s")
+
+_ATTRIBUTES = re.compile(r"<([a-zA-Z][a-zA-Z0-9]*)(\s[^<>]*?)(/?)>")
+# Tolerates the model quoting the alias or adding a space before "/>"
+_ALIAS = re.compile(r"<([a-zA-Z][a-zA-Z0-9]*) k=[\"']?(\d+)[\"']?\s*(/?)>")
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text or "") + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def normalize_whitespace(text: str) -> str:
+    """Collapse runs of spaces and blank lines while keeping paragraph breaks."""
+    text = re.sub(r"[ \t\f\v\u00a0]+", " ", text or "")
+    text = re.sub(r" *\n *", "\n", text)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def _heading(line: str):
+    """
+    The heading text if the whole line is a section heading ("Benefits",
+    "What we offer:", "Why join us"), else None. "Label: value" lines and
+    sentences that merely start with a heading word are content.
+    """
+    # List items ("- 401k matching:") belong to the section they are in
+    if _BULLET.match(line):
+        return None
+    text = line.strip().strip("#*_ ").strip()
+    if not text or len(text) > 60:
+        return None
+    bare = text.rstrip(":").strip()
+    if ":" in bare:
+        return None
+    if text.endswith(":"):
+        return bare
+    known = BOILERPLATE_HEADINGS.match(bare) or SECTION_HEADINGS.match(bare)
+    # Allow a short tail ("Why join us", "Benefits & Perks") but not a sentence
+    if known and _HEADING_TAIL.fullmatch(bare[known.end():]):
+        return bare
+    return None
+
+
+def strip_boilerplate(job_description: str) -> str:
+    """Drop benefits, EEO and similar sections from a job posting."""
+    kept = []
+    skipping = False
+    for line in job_description.split("\n"):
+        heading = _heading(line)
+        if heading is not None:
+            skipping = bool(BOILERPLATE_HEADINGS.match(heading))
+        if skipping or BOILERPLATE_PARAGRAPHS.search(line):
+            continue
+        kept.append(line)
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(kept)).strip()
+
+
+def compact_html(html: str) -> tuple:
+    """
+    Replace each distinct attribute string with a short k=N alias so the model
+    reads (and echoes back) far fewer tokens. Returns (compact_html, aliases)
+    for expand_html.
+    """
+    aliases = {}
+
+    def alias(match):
+        tag, attributes, closing = match.groups()
+        key = aliases.get(attributes, str(len(aliases)))
+        replacement = f"<{tag} k={key}{closing}>"
+        if len(replacement) >= len(match.group(0)):
+            return match.group(0)
+        aliases[attributes] = key
+        return replacement
+
+    compact = _ATTRIBUTES.sub(alias, html)
+    return compact, {key: attributes for attributes, key in aliases.items()}
+
+
+def expand_html(html: str, aliases: dict) -> str:
+    """Undo compact_html on (possibly rewritten) HTML."""
+    if not aliases:
+        return html
+
+    def expand(match):
+        tag, key, closing = match.groups()
+        attributes = aliases.get(key)
+        return f"<{tag}{attributes}{closing}>" if attributes is not None else f"<{tag}{closing}>"
+
+    return _ALIAS.sub(expand, html)
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text.rfind("\n", 0, limit)
+    return text[: cut if cut > limit // 2 else limit].rstrip() + "\n[truncated]"
+
+
+def fit_budget(documents: dict, budget: int = None) -> dict:
+    """
+    Shrink documents (name -> text) to fit a shared token budget, trimming the
+    largest first so short documents are kept whole.
+    """
+    budget = PROMPT_TOKEN_BUDGET if budget is None else budget
+    sizes = {name: estimate_tokens(text) for name, text in documents.items()}
+    if not budget or sum(sizes.values()) <= budget:
+        return documents
+
+    # Give each document an equal share, handing unused share to the larger ones
+    allowance = {}
+    remaining = budget
+    for count, name in enumerate(sorted(sizes, key=sizes.get)):
+        share = remaining // (len(sizes) - count)
+        allowance[name] = min(sizes[name], share)
+        remaining -= allowance[name]
+    return {name: _truncate(text, allowance[name]) for name, text in documents.items()}
+
+
+def prepare_documents(purpose: str, **documents) -> dict:
+    """
+    Normalize whitespace, strip job-posting boilerplate and fit the documents
+    going into a prompt to the token budget. Logs token counts before/after.
+    """
+    before = sum(estimate_tokens(text) for text in documents.values())
+    prepared = {}
+    for name, text in documents.items():
+        text = normalize_whitespace(text)
+        if name == "job_description":
+            text = strip_boilerplate(text)
+        prepared[name] = text
+    prepared = fit_budget(prepared)
+    log_compaction(purpose, before, sum(estimate_tokens(text) for text in prepared.values()))
+    return prepared
+
+
+def log_compaction(purpose: str, before: int, after: int):
+    logger.info("%s prompt input: ~%d tokens -> ~%d tokens", purpose, before, after)
@@ -0,0 +1,155 @@
+import os
+import re
+from html.parser import HTMLParser
+from api.services.keywords import tokenize, STOPWORDS
+
+
+# Sections longer than this are split further at top-level block boundaries
+SECTION_MAX_CHARS = int(os.getenv("SECTION_MAX_CHARS", "2500"))
+
+VOID_TAGS = {"br", "hr", "img", "meta", "link", "input", "col", "wbr", "source"}
+HEADING_TAGS = {"h1", "h2"}
+
+SKILLS_HEADINGS = re.compile(r"skill|technolog|tool|competenc|expertise|stack", re.I)
+EXPERIENCE_HEADINGS = re.compile(r"experience|employment|work|project|career", re.I)
+SUMMARY_HEADINGS = re.compile(r"summary|profile|objective|about", re.I)
+
+
+class _TopLevelScanner(HTMLParser):
+    """Records offsets of top-level elements so the source can be cut without re-serializing it."""
+
+    def __init__(self, html: str):
+        super().__init__(convert_charrefs=True)
+        self._line_starts = [0]
+        for match in re.finditer("\n", html):
+            self._line_starts.append(match.end())
+        self._depth = 0
+        self.blocks = []  # (offset, tag) for every top-level start tag
+        self.headings = {}  # offset -> heading text
+        self._heading = None
+
+    def _offset(self) -> int:
+        line, column = self.getpos()
+        return self._line_starts[line - 1] + column
+
+    def handle_starttag(self, tag, attrs):
+        if self._depth == 0:
+            self.blocks.append((self._offset(), tag))
+            if tag in HEADING_TAGS:
+                self._heading = (self._offset(), [])
+        if tag not in VOID_TAGS:
+            self._depth += 1
+
+    def handle_startendtag(self, tag, attrs):
+        if self._depth == 0:
+            self.blocks.append((self._offset(), tag))
+
+    def handle_endtag(self, tag):
+        if tag in VOID_TAGS:
+            return
+        self._depth = max(0, self._depth - 1)
+        if self._depth == 0 and self._heading is not None:
+            offset, parts = self._heading
+            self.headings[offset] = " ".join("".join(parts).split())
+            self._heading = None
+
+    def handle_data(self, data):
+        if self._heading is not None:
+            self._heading[1].append(data)
+
+
+def split_sections(html: str, max_chars: int = None) -> list:
+    """
+    Cut resume HTML into consecutive sections at top-level <h1>/<h2> headings;
+    sections over max_chars are split again between top-level blocks (e.g.
+    <ul>, <p>). Returns dicts with "heading" and "html"; joining the html
+    values reproduces the input exactly.
+    """
+    max_chars = max_chars or SECTION_MAX_CHARS
+    scanner = _TopLevelScanner(html)
+    scanner.feed(html)
+    scanner.close()
+
+    # Group top-level block offsets under the heading that precedes them
+    groups = [{"heading": "", "starts": [0]}]
+    for offset, tag in scanner.blocks:
+        if tag in HEADING_TAGS and offset > 0:
+            groups.append({"heading": scanner.headings.get(offset, ""), "starts": [offset]})
+        elif tag in HEADING_TAGS:
+            groups[0]["heading"] = scanner.headings.get(offset, "")
+        elif offset > groups[-1]["starts"][0]:
+            groups[-1]["starts"].append(offset)
+
+    sections = []
+    for index, group in enumerate(groups):
+        end = groups[index + 1]["starts"][0] if index + 1 < len(groups) else len(html)
+        chunk_start = previous = group["starts"][0]
+        for offset in group["starts"][1:] + [end]:
+            if offset - chunk_start > max_chars and previous > chunk_start:
+                # Close the chunk at the last block boundary that kept it under the limit
+                sections.append({"heading": group["heading"], "html": html[chunk_start:previous]})
+                chunk_start = previous
+            previous = offset
+        if end > chunk_start:
+            sections.append({"heading": group["heading"], "html": html[chunk_start:end]})
+    return [section for section in sections if section["html"]]
+
+
+def split_nodes(html: str) -> list:
+    """
+    Cut HTML into top-level nodes: each top-level element plus any text that
+    follows it (leading text belongs to the first node). Joining the nodes
+    reproduces the input exactly.
+    """
+    scanner = _TopLevelScanner(html)
+    scanner.feed(html)
+    scanner.close()
+    starts = [0] + [offset for offset, _ in scanner.blocks[1:]]
+    return [html[start:end] for start, end in zip(starts, starts[1:] + [len(html)]) if end > start]
+
+
+def _section_kind(heading: str) -> str:
+    if SKILLS_HEADINGS.search(heading):
+        return "skills"
+    if EXPERIENCE_HEADINGS.search(heading):
+        return "experience"
+    if SUMMARY_HEADINGS.search(heading):
+        return "summary"
+    return "other"
+
+
+def _terms(text: str) -> set:
+    return {
+        word
+        for normalized, _ in tokenize(re.sub(r"<[^>]+>", " ", text))
+        for word in normalized.split()
+        if word not in STOPWORDS
+    }
+
+
+def assign_keywords(sections: list, keywords: list) -> dict:
+    """
+    Map section index -> keywords to weave into it. Every keyword goes to the
+    skills section (if any) and to the experience section sharing the most
+    terms with it, defaulting to the first (most recent) one. Resumes without
+    recognizable headings fall back to the summary or the largest section.
+    """
+    kinds = [_section_kind(section["heading"]) for section in sections]
+    terms = [_terms(section["html"]) for section in sections]
+    skills = [i for i, kind in enumerate(kinds) if kind == "skills"]
+    experience = [i for i, kind in enumerate(kinds) if kind == "experience"]
+    fallback = [i for i, kind in enumerate(kinds) if kind == "summary"] or [
+        max(range(len(sections)), key=lambda i: len(sections[i]["html"]))
+    ]
+
+    plan = {}
+    for keyword in keywords:
+        targets = skills[:1]
+        if experience:
+            keyword_terms = _terms(keyword)
+            targets.append(max(experience, key=lambda i: (len(keyword_terms & terms[i]), -i)))
+        if not targets:
+            targets = fallback[:1]
+        for index in targets:
+            plan.setdefault(index, []).append(keyword)
+    return plan
@@ -0,0 +1,67 @@
+import asyncio
+from api.services.metrics import register_stats
+
+# Name -> SingleFlight, for /api/metrics
+_flights = {}
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key onto one in-flight task.
+    The task is not owned by any one caller: a waiter that is cancelled (e.g.
+    its client disconnected) just stops waiting, and the shared work is only
+    cancelled once every waiter has gone.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls = {}  # key -> {"task", "waiters"}
+        self.started = 0
+        self.coalesced = 0
+        self.cancelled = 0
+        _flights[name] = self
+
+    async def do(self, key: str, factory):
+        """
+        Await factory() (a coroutine function, or a function returning a
+        task), or the identical call already in flight under key. Every waiter
+        receives the same result object.
+        """
+        call = self._calls.get(key)
+        if call is None or call["task"].done():
+            call = {"task": asyncio.ensure_future(factory()), "waiters": 0}
+            self._calls[key] = call
+            call["task"].add_done_callback(lambda _: self._forget(key, call))
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        call["waiters"] += 1
+        try:
+            return await asyncio.shield(call["task"])
+        finally:
+            call["waiters"] -= 1
+            if call["waiters"] == 0 and not call["task"].done():
+                # Later callers must not join a task that is being cancelled
+                self._forget(key, call)
+                call["task"].cancel()
+                self.cancelled += 1
+
+    def _forget(self, key: str, call: dict):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "cancelled": self.cancelled,
+        }
+
+
+def get_singleflight_stats() -> dict:
+    return {name: flight.stats() for name, flight in _flights.items()}
+
+
+register_stats("singleflight", get_singleflight_stats)
@@ -1,9 +1,18 @@
+import asyncio
 import os
-from supabase import create_client, Client
+from typing import TYPE_CHECKING
+from api.services.metrics import timed
 
+# httpx, postgrest and supabase are imported on first use to keep cold starts short
+if TYPE_CHECKING:
+    from postgrest import AsyncPostgrestClient
+    from supabase import Client
 
-def get_supabase_client() -> Client:
+
+def get_supabase_client() -> "Client":
     """Create and return a Supabase client."""
+    from supabase import create_client
+
     url = os.getenv("SUPABASE_URL")
     key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
@@ -15,8 +24,10 @@ def get_supabase_client() -> Client:
     return create_client(url, key)
 
 
-def get_supabase_anon_client() -> Client:
+def get_supabase_anon_client() -> "Client":
     """Create a Supabase client with anon key (for auth verification)."""
+    from supabase import create_client
+
     url = os.getenv("SUPABASE_URL")
     key = os.getenv("SUPABASE_ANON_KEY")
 
@@ -26,3 +37,67 @@ def get_supabase_anon_client() -> Client:
         )
 
     return create_client(url, key)
+
+
+SUPABASE_TIMEOUT_SECONDS = float(os.getenv("SUPABASE_TIMEOUT_SECONDS", "10"))
+SUPABASE_RETRIES = int(os.getenv("SUPABASE_RETRIES", "2"))
+
+_postgrest = None
+
+
+def get_postgrest_client() -> "AsyncPostgrestClient":
+    """
+    Return the application-wide async PostgREST client (service role).
+    The underlying httpx session keeps connections alive across requests.
+    """
+    global _postgrest
+    if _postgrest is None:
+        url = os.getenv("SUPABASE_URL")
+        key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+
+        if not url or not key:
+            raise ValueError(
+                "SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY environment variables must be set"
+            )
+
+        from postgrest import AsyncPostgrestClient
+
+        _postgrest = AsyncPostgrestClient(
+            f"{url}/rest/v1",
+            headers={
+                "apikey": key,
+                "Authorization": f"Bearer {key}",
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+            },
+            timeout=SUPABASE_TIMEOUT_SECONDS,
+        )
+    return _postgrest
+
+
+async def close_postgrest_client():
+    """Close the shared PostgREST session; called on application shutdown."""
+    global _postgrest
+    if _postgrest is not None:
+        await _postgrest.aclose()
+        _postgrest = None
+
+
+async def execute(build_query, idempotent: bool = True):
+    """
+    Execute a PostgREST query with a per-call timeout and retries.
+    build_query receives the shared client and returns a request builder.
+    Non-idempotent writes are only retried when the connection was never made.
+    """
+    import httpx
+
+    retryable = (httpx.TransportError, asyncio.TimeoutError) if idempotent else (httpx.ConnectError,)
+    with timed("supabase"):
+        for attempt in range(SUPABASE_RETRIES + 1):
+            try:
+                query = build_query(get_postgrest_client())
+                return await asyncio.wait_for(query.execute(), SUPABASE_TIMEOUT_SECONDS)
+            except retryable:
+                if attempt == SUPABASE_RETRIES:
+                    raise
+                await asyncio.sleep(0.2 * 2 ** attempt)
@@ -0,0 +1,69 @@
+import importlib
+import logging
+import os
+import threading
+import time
+from api.services.metrics import observe, register_stats
+
+logger = logging.getLogger(__name__)
+
+# Subsystem -> heavy modules it imports on first use. None of these may be
+# imported by `import api.main` (benchmarks/import_time.py checks this).
+HEAVY_MODULES = {
+    "llm": ("google.generativeai",),
+    "parse": ("pdfplumber", "pypdfium2", "mammoth"),
+    "export": ("docx", "htmldocx", "reportlab.platypus"),
+    "supabase": ("httpx", "postgrest"),
+}
+# Comma-separated subsystems to import in the background after startup, or
+# "all"; empty (the default) leaves everything to first use.
+PREWARM_IMPORTS = os.getenv("PREWARM_IMPORTS", "")
+
+_imported = {}  # subsystem -> milliseconds spent importing it
+
+
+def prewarm(subsystems=None):
+    """Import the heavy modules of the given subsystems (default: all)."""
+    for subsystem in subsystems or HEAVY_MODULES:
+        if subsystem in _imported:
+            continue
+        started = time.perf_counter()
+        for module in HEAVY_MODULES.get(subsystem, ()):
+            try:
+                importlib.import_module(module)
+            except ImportError as e:
+                logger.warning("Prewarm of %s skipped %s: %s", subsystem, module, e)
+        seconds = time.perf_counter() - started
+        observe(f"import-{subsystem}", seconds)
+        _imported[subsystem] = round(seconds * 1000, 1)
+
+
+def _prewarm_app(subsystems):
+    """prewarm() here, except that pooled subsystems are warmed inside their worker processes."""
+    from api.services.exporter import export_pool
+    from api.services.parser import parse_pool
+
+    pools = {"parse": parse_pool, "export": export_pool}
+    for subsystem in subsystems or HEAVY_MODULES:
+        pool = pools.get(subsystem)
+        if pool is None or not pool.warm(prewarm, [subsystem]):
+            prewarm([subsystem])
+
+
+def start_prewarm(setting: str = None):
+    """Warm the subsystems named in PREWARM_IMPORTS from a daemon thread."""
+    setting = (PREWARM_IMPORTS if setting is None else setting).strip()
+    if not setting:
+        return None
+    subsystems = None if setting == "all" else [name.strip() for name in setting.split(",") if name.strip()]
+    thread = threading.Thread(target=_prewarm_app, args=(subsystems,), name="prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def get_prewarm_stats() -> dict:
+    """Milliseconds spent importing each subsystem prewarmed in this process."""
+    return dict(_imported)
+
+
+register_stats("prewarm_ms", get_prewarm_stats)
@@ -0,0 +1,184 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import asyncio
+import multiprocessing
+import time
+from api.services.metrics import observe
+
+
+class WorkerBusyError(RuntimeError):
+    """Raised when a pool's wait queue is full."""
+
+
+class WorkerTimeoutError(TimeoutError):
+    """Raised when a job exceeds the pool's wall-clock limit."""
+
+
+class WorkerCrashedError(RuntimeError):
+    """Raised when a worker died (e.g. hit its memory limit) while running a job."""
+
+
+def _limit_worker_memory(limit_mb: int):
+    """Process-pool initializer: cap the worker's address space."""
+    if limit_mb <= 0:
+        return
+    try:
+        import resource
+        limit = limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError):
+        # Not supported on this platform; rely on the wall-clock timeout only.
+        pass
+
+
+class WorkerPool:
+    """
+    Process pool for CPU-heavy jobs with a bounded wait queue, per-job
+    wall-clock timeout, per-worker memory limit and queue/run-time metrics.
+    With workers <= 0 (or where multiprocessing is unavailable) jobs run in
+    a thread instead, with no memory limit: a job over the timeout is
+    reported as such, but its thread cannot be killed and runs to completion.
+    """
+
+    def __init__(self, name: str, workers: int, timeout: float, max_queue: int = 0, memory_limit_mb: int = 0):
+        self.name = name
+        self.workers = workers
+        self.timeout = timeout
+        self.max_queue = max_queue
+        self.memory_limit_mb = memory_limit_mb
+        self._executor = None
+        self._slots = None
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.rejected = 0
+        self.retried = 0
+        self.total_queue_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    def _get_executor(self):
+        if self.workers <= 0:
+            return None
+        if self._executor is None:
+            try:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_limit_worker_memory,
+                    initargs=(self.memory_limit_mb,),
+                )
+            except (OSError, NotImplementedError):
+                # Some serverless sandboxes lack the semaphores multiprocessing needs.
+                self.workers = 0
+                return None
+        return self._executor
+
+    def reset(self, executor=None):
+        """
+        Kill every worker (e.g. after a hung job) and start fresh on the next
+        job. With an executor, only reset if it is still the current one, so
+        jobs that failed because of an earlier reset don't kill its replacement.
+        """
+        if executor is not None and executor is not self._executor:
+            return
+        executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        # ProcessPoolExecutor cannot cancel a running job, so terminate the workers directly.
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        """Stop the workers; called on application shutdown."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def warm(self, func, *args) -> bool:
+        """
+        Start the workers and run func(*args) once per worker in the background
+        (e.g. to import heavy modules). Returns False when jobs run in threads,
+        in which case the caller should warm its own process instead.
+        """
+        executor = self._get_executor()
+        if executor is None:
+            return False
+        for _ in range(self.workers):
+            executor.submit(func, *args)
+        return True
+
+    async def run(self, func, *args):
+        """Run func(*args) on a worker once one is free."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(max(1, self.workers))
+        if self._slots.locked() and self.max_queue and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise WorkerBusyError(f"The {self.name} queue is full, please retry shortly")
+
+        queued_at = time.monotonic()
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        started_at = time.monotonic()
+
+        self.running += 1
+        deadline = started_at + self.timeout
+        retried = False
+        try:
+            while True:
+                executor = self._get_executor()
+                if executor is None:
+                    job = asyncio.to_thread(func, *args)
+                else:
+                    job = asyncio.get_running_loop().run_in_executor(executor, func, *args)
+                try:
+                    result = await asyncio.wait_for(job, max(0.0, deadline - time.monotonic()))
+                except BrokenProcessPool:
+                    if retried or executor is self._executor:
+                        raise
+                    # Another job's timeout or crash reset the pool under this
+                    # one; run it again on the new workers
+                    retried = True
+                    self.retried += 1
+                    continue
+                self.completed += 1
+                return result
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            self.reset(executor)
+            raise WorkerTimeoutError(f"{self.name} job exceeded {self.timeout:.0f}s")
+        except (BrokenProcessPool, MemoryError):
+            self.failed += 1
+            self.reset(executor)
+            raise WorkerCrashedError(f"{self.name} worker ran out of memory or crashed")
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            finished_at = time.monotonic()
+            self.running -= 1
+            self._slots.release()
+            self.total_queue_seconds += started_at - queued_at
+            self.total_run_seconds += finished_at - started_at
+            observe(f"{self.name}-queue", started_at - queued_at)
+            observe(f"{self.name}-run", finished_at - started_at)
+
+    def stats(self) -> dict:
+        done = self.completed + self.failed + self.timed_out
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "queue_depth": self.waiting,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "rejected": self.rejected,
+            "retried": self.retried,
+            "avg_queue_seconds": round(self.total_queue_seconds / done, 4) if done else 0.0,
+            "avg_run_seconds": round(self.total_run_seconds / done, 4) if done else 0.0,
+        }
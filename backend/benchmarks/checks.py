@@ -0,0 +1,143 @@
+"""
+Regression checks for edge cases the load tests don't exercise. Each check
+prints OK or FAIL; the script exits 1 if any check fails.
+
+Run from backend/:  python -m benchmarks.checks
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# Spool every upload to disk and parse in-process so the shared-parse check
+# exercises temp-file lifetimes deterministically.
+os.environ["UPLOAD_SPOOL_KB"] = "1"
+os.environ["PARSE_WORKERS"] = "0"
+
+from api.services import parser
+from api.services.keywords import extract_keywords
+from api.services.prompts import strip_boilerplate
+from api.services.workers import WorkerPool
+from benchmarks.corpus import build_corpus, read
+
+CHECKS = []
+
+
+def check(func):
+    CHECKS.append(func)
+    return func
+
+
+@check
+async def shared_parse_survives_leader_cancel():
+    """A coalesced parse keeps working after the caller that started it disconnects."""
+    content = read(build_corpus()[("medium", "pdf")])
+    parser.parse_cache.clear()
+
+    def spool():
+        upload = parser.SpooledUpload("resume.pdf")
+        upload.write(content)
+        return upload
+
+    async def caller(upload):
+        with upload:
+            return await parser.parse_upload(upload)
+
+    leader = asyncio.ensure_future(caller(spool()))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(caller(spool()))
+    await asyncio.sleep(0)
+    leader.cancel()
+    text, _, _ = await follower
+    assert text.strip(), "follower got no text"
+
+
+@check
+async def cancelled_shared_parse_releases_its_copy():
+    """A shared parse cancelled before it starts still deletes its copy of the upload."""
+    content = read(build_corpus()[("small", "pdf")])
+    parser.parse_cache.clear()
+    before = set(os.listdir(tempfile.gettempdir()))
+
+    upload = parser.SpooledUpload("resume.pdf")
+    upload.write(content)
+    with upload:
+        leader = asyncio.ensure_future(parser.parse_upload(upload))
+        await asyncio.sleep(0)
+        # The leader has started the shared task, which hasn't had its first step yet
+        for call in list(parser.parse_flight._calls.values()):
+            call["task"].cancel()
+        leader.cancel()
+        await asyncio.gather(leader, return_exceptions=True)
+    # Let the cancellation and the task's done callbacks run
+    await asyncio.sleep(0.1)
+    leaked = set(os.listdir(tempfile.gettempdir())) - before
+    assert not leaked, leaked
+
+
+@check
+async def ambiguous_skill_names_need_context():
+    """Common words that are also skill names only match where they name the skill."""
+    prose = "Work with the rest of the team on R&D and go-to-market. Go to our site and send your CV."
+    assert extract_keywords(prose) == [], extract_keywords(prose)
+    listed = "Skills: Go, R, REST APIs and ML in Node"
+    assert extract_keywords(listed) == ["Go", "R", "REST APIs", "Machine Learning", "Node.js"], extract_keywords(listed)
+
+
+@check
+async def bullets_do_not_end_boilerplate():
+    """A list item ending in a colon doesn't start a new section."""
+    posting = "Requirements:\n- Python\n\nBenefits:\n- 401k matching:\n- Remote work\n* Gym stipend:\n\nSkills:\n- SQL"
+    assert strip_boilerplate(posting) == "Requirements:\n- Python\n\nSkills:\n- SQL", strip_boilerplate(posting)
+
+
+@check
+async def label_value_lines_are_not_headings():
+    """Lines that only start with a boilerplate word don't start a skipped section."""
+    posting = (
+        "About us: we build payments infra\n"
+        "You will design services in Go and deploy them on Kubernetes.\n\n"
+        "Benefits: remote, Go, Kubernetes\n"
+        "Benefits include a home-office budget\n\n"
+        "Benefits\n- Gym"
+    )
+    kept = strip_boilerplate(posting)
+    assert kept == posting[: posting.index("\n\nBenefits\n")], kept
+
+
+@check
+async def pool_timeout_spares_other_jobs():
+    """A hung job's pool reset doesn't fail the job running beside it or the one started after it."""
+    pool = WorkerPool("check", 2, 8.0)
+    try:
+        # Start both workers first; spawning is slow next to the job durations
+        await asyncio.gather(pool.run(time.sleep, 0.5), pool.run(time.sleep, 0.5))
+
+        async def job(delay, start):
+            await asyncio.sleep(start)
+            return await pool.run(time.sleep, delay)
+
+        hung, beside, after = await asyncio.gather(
+            job(60, 0), job(2, 7), job(1, 7.5), return_exceptions=True
+        )
+        assert type(hung).__name__ == "WorkerTimeoutError", repr(hung)
+        assert beside is None and after is None, (beside, after)
+    finally:
+        pool.shutdown()
+
+
+async def main():
+    failed = 0
+    for func in CHECKS:
+        try:
+            await func()
+            print(f"OK    {func.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"FAIL  {func.__name__}: {type(e).__name__}: {e}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
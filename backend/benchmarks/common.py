@@ -0,0 +1,28 @@
+import statistics
+
+
+def percentile(samples: list, q: float) -> float:
+    """Nearest-rank percentile of samples (q in 0..100)."""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def summarize(samples: list) -> dict:
+    """Latency summary in milliseconds."""
+    return {
+        "n": len(samples),
+        "p50": percentile(samples, 50) * 1000,
+        "p95": percentile(samples, 95) * 1000,
+        "p99": percentile(samples, 99) * 1000,
+        "mean": statistics.fmean(samples) * 1000 if samples else 0.0,
+    }
+
+
+def print_table(header: tuple, rows: list):
+    widths = [max(len(str(cell)) for cell in column) for column in zip(header, *rows)]
+    for row in [header] + rows:
+        print("  ".join(str(cell).rjust(width) if index else str(cell).ljust(width)
+                        for index, (cell, width) in enumerate(zip(row, widths))))
@@ -0,0 +1,88 @@
+"""
+Synthetic PDF/DOCX resume corpus at several sizes, generated deterministically
+and cached under the system temp directory.
+"""
+import os
+import random
+import tempfile
+
+from api.services.exporter import export_docx, export_pdf_xhtml2pdf
+
+# Size name -> number of experience sections (about 1, 3 and 10 printed pages)
+SIZES = {"small": 2, "medium": 7, "large": 24}
+CORPUS_DIR = os.getenv("BENCH_CORPUS_DIR", os.path.join(tempfile.gettempdir(), "resume-bench-corpus"))
+
+SKILLS = [
+    "Python", "FastAPI", "Django", "PostgreSQL", "Redis", "Docker", "Kubernetes", "AWS",
+    "Terraform", "React", "TypeScript", "Kafka", "GraphQL", "CI/CD", "Linux", "Go",
+]
+VERBS = ["Built", "Designed", "Led", "Migrated", "Optimized", "Automated", "Scaled", "Shipped"]
+THINGS = [
+    "a payments API", "the search service", "an event pipeline", "the reporting dashboard",
+    "a feature-flag platform", "the mobile backend", "a data warehouse", "the billing system",
+]
+OUTCOMES = [
+    "cutting p95 latency by 40%", "serving 2M requests per day", "saving $120k a year in cloud spend",
+    "reducing on-call pages by half", "raising test coverage to 90%", "onboarding 30 enterprise customers",
+]
+JOB_DESCRIPTION = """Senior Backend Engineer
+
+About the role
+We are looking for a backend engineer to build reliable, fast APIs for our payments platform.
+
+Requirements:
+- 5+ years of Python, FastAPI or Django
+- PostgreSQL, Redis and Docker in production
+- Kubernetes, Terraform and AWS experience
+- Event streaming with Kafka; GraphQL a plus
+
+Benefits
+- Health, dental and vision insurance
+- Unlimited PTO
+
+We are an equal opportunity employer and value diversity at our company.
+"""
+
+
+def resume_html(sections: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts = [
+        '<h1 style="text-align: center">Jordan Example</h1>',
+        '<p style="text-align: center">jordan@example.com | +1 555 0100 | github.com/jordan</p>',
+        "<h2>Summary</h2>",
+        "<p>Backend engineer with ten years of experience building distributed systems and developer tooling.</p>",
+        "<h2>Skills</h2>",
+        f"<p>{', '.join(rng.sample(SKILLS, 10))}</p>",
+        "<h2>Experience</h2>",
+    ]
+    for index in range(sections):
+        parts.append(f"<h3>Senior Engineer, Company {index + 1} ({2023 - index * 2} - {2025 - index * 2})</h3>")
+        bullets = "".join(
+            f"<li>{rng.choice(VERBS)} {rng.choice(THINGS)} with {rng.choice(SKILLS)} and "
+            f"{rng.choice(SKILLS)}, {rng.choice(OUTCOMES)}.</li>"
+            for _ in range(6)
+        )
+        parts.append(f"<ul>{bullets}</ul>")
+    parts += ["<h2>Education</h2>", "<p>B.Sc. Computer Science, Example University</p>"]
+    return "".join(parts)
+
+
+def build_corpus() -> dict:
+    """Return {(size, "pdf" | "docx" | "html"): path}, generating missing files."""
+    os.makedirs(CORPUS_DIR, exist_ok=True)
+    corpus = {}
+    for size, sections in SIZES.items():
+        html = resume_html(sections, seed=sections)
+        for kind, render in (("html", str.encode), ("pdf", export_pdf_xhtml2pdf), ("docx", export_docx)):
+            path = os.path.join(CORPUS_DIR, f"resume-{size}.{kind}")
+            if not os.path.exists(path):
+                data = render(html)
+                with open(path, "wb") as handle:
+                    handle.write(data)
+            corpus[(size, kind)] = path
+    return corpus
+
+
+def read(path: str) -> bytes:
+    with open(path, "rb") as handle:
+        return handle.read()
@@ -0,0 +1,60 @@
+"""
+Per-document PDF render time: native reportlab renderer vs xhtml2pdf.
+
+Run from backend/:  python -m benchmarks.export_pdf [--runs N]
+"""
+import argparse
+import statistics
+import time
+
+from api.services.exporter import export_pdf_xhtml2pdf
+from api.services.pdf_native import render_pdf_native
+
+SECTION = """
+<h2>Experience</h2>
+<h3>Senior Software Engineer, Acme Corp</h3>
+<p><em>2019 - Present</em></p>
+<ul>
+  <li>Built <strong>Python</strong> and <strong>FastAPI</strong> services handling 2M requests/day</li>
+  <li>Cut p95 latency by 40% with Redis caching and PostgreSQL query tuning</li>
+  <li>Mentored four engineers; introduced CI/CD with GitHub Actions and Docker</li>
+</ul>
+<p>Led the migration of a monolith to Kubernetes, coordinating across three teams.</p>
+"""
+
+DOCUMENTS = {
+    "one-page": (
+        '<h1 style="text-align: center">Jane Doe</h1>'
+        '<p style="text-align: center">jane@example.com | <a href="https://example.com">example.com</a></p>'
+        "<h2>Summary</h2><p>Backend engineer focused on reliable, fast APIs.</p>"
+        + SECTION * 2
+    ),
+    "three-page": '<h1>Jane Doe</h1>' + SECTION * 12,
+}
+
+
+def _time(render, html: str, runs: int) -> list:
+    render(html)  # warm up styles/fonts
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        render(html)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'document':<12} {'renderer':<10} {'median ms':>10} {'p95 ms':>10}")
+    for name, html in DOCUMENTS.items():
+        for label, render in (("native", render_pdf_native), ("xhtml2pdf", export_pdf_xhtml2pdf)):
+            samples = sorted(_time(render, html, args.runs))
+            p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+            print(f"{name:<12} {label:<10} {statistics.median(samples) * 1000:>10.1f} {p95 * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Local stand-ins for Gemini and Supabase so benchmarks run offline with
+realistic latency and payload sizes.
+
+Latency knobs (environment, milliseconds unless noted):
+  FAKE_LLM_FIRST_TOKEN_MS   time to first token (default 400)
+  FAKE_LLM_TOKENS_PER_SEC   output speed (default 150)
+  FAKE_DB_LATENCY_MS        per PostgREST/auth request (default 15)
+  FAKE_LLM_TAIL_RATE        fraction of Gemini calls that are slow (default 0)
+  FAKE_LLM_TAIL_MS          extra latency of a slow call (default 5000)
+  FAKE_LLM_ERROR_RATE       fraction of Gemini calls that fail (default 0)
+"""
+import asyncio
+import json
+import os
+import random
+import re
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+FAKE_LLM_FIRST_TOKEN_MS = float(os.getenv("FAKE_LLM_FIRST_TOKEN_MS", "400"))
+FAKE_LLM_TOKENS_PER_SEC = float(os.getenv("FAKE_LLM_TOKENS_PER_SEC", "150"))
+FAKE_DB_LATENCY_MS = float(os.getenv("FAKE_DB_LATENCY_MS", "15"))
+FAKE_LLM_TAIL_RATE = float(os.getenv("FAKE_LLM_TAIL_RATE", "0"))
+FAKE_LLM_TAIL_MS = float(os.getenv("FAKE_LLM_TAIL_MS", "5000"))
+FAKE_LLM_ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+
+CHARS_PER_TOKEN = 4
+STREAM_CHUNK_TOKENS = 20
+
+ANALYSIS = {
+    "ats_score": 72,
+    "job_title": "Senior Backend Engineer",
+    "matched_keywords": ["Python", "FastAPI", "PostgreSQL", "Docker", "REST APIs", "Git"],
+    "missing_keywords": ["Kubernetes", "Terraform", "Kafka", "GraphQL"],
+    "suggestions": [
+        "Add Kubernetes to the skills section and mention the clusters you deployed to.",
+        "Describe infrastructure work with Terraform in your most recent role.",
+        "Quantify the throughput of the event pipelines you built (e.g. Kafka topics, messages/s).",
+        "Mention GraphQL if you have exposed or consumed GraphQL APIs.",
+    ],
+}
+
+
+# Fake Gemini
+
+class _Usage:
+    def __init__(self, prompt_tokens: int, output_tokens: int):
+        self.prompt_token_count = prompt_tokens
+        self.candidates_token_count = output_tokens
+
+
+class _Response:
+    def __init__(self, text: str, usage: _Usage = None):
+        self.text = text
+        self.usage_metadata = usage
+
+
+class _Stream:
+    def __init__(self, chunks: list, usage: _Usage):
+        self._chunks = chunks
+        self._usage = usage
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for index, chunk in enumerate(self._chunks):
+            await asyncio.sleep(STREAM_CHUNK_TOKENS / FAKE_LLM_TOKENS_PER_SEC)
+            last = index == len(self._chunks) - 1
+            yield _Response(chunk, self._usage if last else None)
+
+
+def _answer(prompt: str) -> str:
+    """A plausible response for each prompt the app sends."""
+    if "KEYWORDS TO ADD" in prompt:
+        document = prompt.split("---\n", 1)[1].rsplit("\n---", 1)[0]
+        keywords = prompt.split("KEYWORDS TO ADD:\n", 1)[1].split("\n", 1)[0]
+        # Append the keywords to the first list item or paragraph, like the real model tends to
+        return re.sub(r"</(li|p)>", f", {keywords}</\\1>", document, count=1)
+    if '"ats_score"' in prompt:
+        return json.dumps(ANALYSIS, indent=2)
+    return json.dumps({"job_title": ANALYSIS["job_title"], "suggestions": ANALYSIS["suggestions"]}, indent=2)
+
+
+class FakeModel:
+    """Drop-in for genai.GenerativeModel with configurable latency and streaming."""
+
+    def __init__(self, model_name: str = "fake", **kwargs):
+        self.model_name = model_name
+
+    async def generate_content_async(self, prompt, stream: bool = False, request_options=None, **kwargs):
+        text = _answer(prompt)
+        usage = _Usage(len(prompt) // CHARS_PER_TOKEN, len(text) // CHARS_PER_TOKEN)
+        await asyncio.sleep(FAKE_LLM_FIRST_TOKEN_MS / 1000)
+        if random.random() < FAKE_LLM_ERROR_RATE:
+            raise RuntimeError("503 The model is overloaded. Please try again later.")
+        if random.random() < FAKE_LLM_TAIL_RATE:
+            await asyncio.sleep(FAKE_LLM_TAIL_MS / 1000)
+        if stream:
+            size = STREAM_CHUNK_TOKENS * CHARS_PER_TOKEN
+            return _Stream([text[i:i + size] for i in range(0, len(text), size)] or [""], usage)
+        await asyncio.sleep(usage.candidates_token_count / FAKE_LLM_TOKENS_PER_SEC)
+        return _Response(text, usage)
+
+
+def install_fake_llm():
+    """Route every Gemini call in the app to FakeModel."""
+    # llm.get_model imports the SDK lazily, so patch the module it will find
+    import google.generativeai as genai
+    os.environ.setdefault("GEMINI_API_KEY", "fake")
+    genai.configure = lambda **kwargs: None
+    genai.GenerativeModel = FakeModel
+
+
+# Fake Supabase (PostgREST + auth)
+
+_tables = {}
+
+
+def _matches(row: dict, params) -> bool:
+    for column, condition in params.multi_items():
+        if column in ("select", "order", "limit", "offset", "or", "on_conflict", "columns"):
+            continue
+        operator, _, value = condition.partition(".")
+        if operator == "eq" and str(row.get(column)) != value.strip('"'):
+            return False
+        if operator == "in" and str(row.get(column)) not in value.strip("()").replace('"', "").split(","):
+            return False
+    return True
+
+
+def _project(row: dict, select: str) -> dict:
+    if not select or select == "*":
+        return row
+    return {column: row.get(column) for column in select.split(",")}
+
+
+async def _table(request: Request):
+    await asyncio.sleep(FAKE_DB_LATENCY_MS / 1000)
+    table = _tables.setdefault(request.path_params["table"], [])
+    params = request.query_params
+
+    if request.method == "POST":
+        payload = json.loads(await request.body() or b"[]")
+        rows = payload if isinstance(payload, list) else [payload]
+        inserted = []
+        for row in rows:
+            if "on_conflict" in params and any(
+                existing.get(params["on_conflict"]) == row.get(params["on_conflict"]) for existing in table
+            ):
+                continue
+            row = dict(row)
+            row.setdefault("id", str(uuid.uuid4()))
+            row.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+            table.append(row)
+            inserted.append(row)
+        return JSONResponse(inserted, status_code=201)
+
+    matched = [row for row in table if _matches(row, params)]
+    if request.method == "DELETE":
+        _tables[request.path_params["table"]] = [row for row in table if row not in matched]
+        return JSONResponse(matched)
+
+    if params.get("select") == "count":
+        return JSONResponse([{"count": len(matched)}], headers={"Content-Range": f"0-0/{len(matched)}"})
+    # Only the first sort key matters for benchmarking; keyset "or" filters are ignored
+    for order in reversed(params.getlist("order")[:1]):
+        column, _, direction = order.partition(".")
+        matched.sort(key=lambda row: str(row.get(column)), reverse=direction.startswith("desc"))
+    if "limit" in params:
+        matched = matched[: int(params["limit"])]
+    rows = [_project(row, params.get("select")) for row in matched]
+    return JSONResponse(rows, headers={"Content-Range": f"0-{max(0, len(rows) - 1)}/{len(rows)}"})
+
+
+async def _auth_user(request: Request):
+    await asyncio.sleep(FAKE_DB_LATENCY_MS / 1000)
+    if not request.headers.get("authorization", "").startswith("Bearer "):
+        return Response(status_code=401)
+    return JSONResponse({"id": "00000000-0000-0000-0000-000000000001", "email": "bench@example.com"})
+
+
+supabase_app = Starlette(routes=[
+    Route("/rest/v1/{table}", _table, methods=["GET", "POST", "PATCH", "DELETE"]),
+    Route("/auth/v1/user", _auth_user),
+])
+
+
+def install_fake_supabase():
+    """Point the app's PostgREST and auth HTTP clients at the in-process fake."""
+    from api.services import auth, supabase
+    os.environ.setdefault("SUPABASE_URL", "http://supabase.fake")
+    os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "fake-service-key")
+    os.environ.setdefault("SUPABASE_ANON_KEY", "fake-anon-key")
+
+    transport = httpx.ASGITransport(app=supabase_app)
+    client = supabase.get_postgrest_client()
+    session = client.session
+    client.session = httpx.AsyncClient(
+        base_url=session.base_url, headers=session.headers, timeout=session.timeout, transport=transport
+    )
+    auth._http_client = httpx.AsyncClient(transport=transport, timeout=auth.AUTH_TIMEOUT_SECONDS)
+
+
+def seed_history(user_id: str, entries: int, body: str):
+    """Give a user some history rows so list endpoints return realistic payloads."""
+    rows = _tables.setdefault("history", [])
+    for index in range(entries):
+        rows.append({
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "created_at": datetime(2024, 1, 1 + index % 28, tzinfo=timezone.utc).isoformat(),
+            "job_title": f"Engineer {index}",
+            "ats_score": 50 + index % 50,
+            "source_type": "docx",
+            "matched_keywords": ANALYSIS["matched_keywords"],
+            "missing_keywords": ANALYSIS["missing_keywords"],
+            "suggestions": ANALYSIS["suggestions"],
+            "resume_text": body,
+            "resume_html": f"<p>{body}</p>",
+            "final_resume_html": f"<p>{body}</p>",
+            "job_description": body[:2000],
+        })
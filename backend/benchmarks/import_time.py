@@ -0,0 +1,93 @@
+"""
+Cold-start import budget: times `import api.main` in fresh interpreters,
+breaks the cost down by top-level package, and exits non-zero when the median
+exceeds the budget or a lazily-loaded heavy module is imported eagerly.
+
+Run from backend/:  python -m benchmarks.import_time [--budget-ms MS] [--runs N] [--top N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks.common import print_table
+
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+
+TIMER = (
+    "import time; started = time.perf_counter(); import api.main; "
+    "print((time.perf_counter() - started) * 1000)"
+)
+
+
+def _heavy_modules() -> list:
+    """(subsystem, module) pairs that must stay lazy; read in a subprocess so this one stays cold."""
+    script = (
+        "from api.services.warmup import HEAVY_MODULES\n"
+        "for subsystem, modules in HEAVY_MODULES.items():\n"
+        "    for module in modules: print(subsystem, module)"
+    )
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    return [tuple(line.split()) for line in output.splitlines()]
+
+
+def _time_import() -> float:
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", TIMER], capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def _import_profile() -> list:
+    """(module, self_us) for every module `import api.main` loads, from -X importtime."""
+    stderr = subprocess.run(
+        [sys.executable, "-W", "ignore", "-X", "importtime", "-c", "import api.main"],
+        capture_output=True, text=True, check=True,
+    ).stderr
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us)))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters to time (median is used)")
+    parser.add_argument("--top", type=int, default=10, help="packages to show in the breakdown")
+    args = parser.parse_args()
+
+    samples = [_time_import() for _ in range(args.runs)]
+    profile = _import_profile()
+
+    by_package = {}
+    for name, self_us in profile:
+        package = name.split(".")[0]
+        by_package[package] = by_package.get(package, 0) + self_us
+    rows = [
+        (package, f"{self_us / 1000:.1f}")
+        for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[: args.top]
+    ]
+    print_table(("package", "import ms"), rows)
+
+    loaded = {name for name, _ in profile}
+    eager = [f"{module} ({subsystem})" for subsystem, module in _heavy_modules() if module in loaded]
+    median = statistics.median(samples)
+    print(f"\nimport api.main: median {median:.0f} ms over {len(samples)} runs (budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    if eager:
+        print("FAIL: heavy modules imported at startup: " + ", ".join(eager))
+        failed = True
+    if median > args.budget_ms:
+        print("FAIL: cold-start import time is over budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Concurrent end-to-end load runs against the FastAPI app with fake Gemini and
+Supabase backends; reports p50/p95/p99 latency and throughput per scenario.
+
+Run from backend/:  python -m benchmarks.load [--scenario NAME ...] [--requests N] [--concurrency C]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+# Configure the app before it is imported; callers can still override these.
+os.environ.setdefault("SUPABASE_URL", "http://supabase.fake")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "fake-service-key")
+os.environ.setdefault("SUPABASE_ANON_KEY", "fake-anon-key")
+os.environ.setdefault("SUPABASE_JWT_SECRET", "bench-secret")
+os.environ.setdefault("GEMINI_API_KEY", "fake")
+
+import httpx
+from jose import jwt
+
+from api.main import app
+from benchmarks.common import print_table, summarize
+from benchmarks.corpus import JOB_DESCRIPTION, build_corpus, read
+from benchmarks.fakes import install_fake_llm, install_fake_supabase, seed_history
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+PDF_TYPE = "application/pdf"
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+def _token() -> str:
+    claims = {"sub": USER_ID, "email": "bench@example.com", "aud": "authenticated", "exp": int(time.time()) + 3600}
+    return jwt.encode(claims, os.environ.get("SUPABASE_JWT_SECRET") or "unverifiable", algorithm="HS256")
+
+
+def _scenarios(corpus: dict, size: str, cached: bool) -> dict:
+    """Scenario name -> function(client, index) issuing one request."""
+    pdf = read(corpus[(size, "pdf")])
+    docx = read(corpus[(size, "docx")])
+    html = read(corpus[(size, "html")]).decode("utf-8")
+    # Unless measuring warm caches, make every request's content unique
+    vary = (lambda index: "") if cached else (lambda index: f"<p>Request {index}</p>")
+    bypass = "false" if cached else "true"
+
+    def analyze(filename, content, content_type, mode):
+        async def run(client, index):
+            return await client.post(
+                "/api/analyze",
+                files={"resume": (filename, content, content_type)},
+                data={"job_description": JOB_DESCRIPTION, "mode": mode, "bypass_cache": bypass},
+            )
+        return run
+
+    async def apply_keywords(client, index):
+        return await client.post("/api/apply-keywords", json={
+            "resume_html": html + vary(index), "keywords": ["Kubernetes", "Terraform"], "source_type": "docx",
+        })
+
+    def export(fmt):
+        async def run(client, index):
+            return await client.post(f"/api/export/{fmt}", json={"html_content": html + vary(index)})
+        return run
+
+    async def history_list(client, index):
+        return await client.get("/api/history")
+
+    async def history_summary(client, index):
+        return await client.get("/api/history/summary", params={"limit": 20})
+
+    async def history_create(client, index):
+        return await client.post("/api/history", json={
+            "job_title": "Senior Backend Engineer", "job_description": JOB_DESCRIPTION,
+            "resume_text": html, "resume_html": html, "ats_score": 72,
+            "matched_keywords": ["Python"], "missing_keywords": ["Kafka"], "suggestions": ["Add Kafka"],
+        })
+
+    return {
+        "analyze-pdf": analyze("resume.pdf", pdf, PDF_TYPE, "llm"),
+        "analyze-docx": analyze("resume.docx", docx, DOCX_TYPE, "llm"),
+        "analyze-hybrid": analyze("resume.docx", docx, DOCX_TYPE, "hybrid"),
+        "analyze-fast": analyze("resume.pdf", pdf, PDF_TYPE, "fast"),
+        "apply-keywords": apply_keywords,
+        "export-pdf": export("pdf"),
+        "export-docx": export("docx"),
+        "history-list": history_list,
+        "history-summary": history_summary,
+        "history-create": history_create,
+    }
+
+
+async def _run_scenario(client, request, total: int, concurrency: int) -> tuple:
+    latencies, errors = [], 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for index in counter:
+            started = time.perf_counter()
+            try:
+                response = await request(client, index)
+                failed = response.status_code >= 400
+            except Exception:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenario", action="append", help="scenario to run (repeatable; default all)")
+    parser.add_argument("--requests", type=int, default=40, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--size", choices=("small", "medium", "large"), default="small")
+    parser.add_argument("--cached", action="store_true", help="allow cache hits (identical content)")
+    parser.add_argument("--history-rows", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=1, help="untimed requests per scenario (worker spawn, imports)")
+    args = parser.parse_args()
+
+    corpus = build_corpus()
+    install_fake_llm()
+    install_fake_supabase()
+    seed_history(USER_ID, args.history_rows, read(corpus[(args.size, "html")]).decode("utf-8"))
+    scenarios = _scenarios(corpus, args.size, args.cached)
+    selected = args.scenario or list(scenarios)
+
+    rows = []
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {_token()}"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers, timeout=120) as client:
+        for name in selected:
+            for index in range(args.warmup):
+                await scenarios[name](client, -1 - index)
+            latencies, errors, elapsed = await _run_scenario(client, scenarios[name], args.requests, args.concurrency)
+            stats = summarize(latencies)
+            rows.append((
+                name, stats["n"], errors, f"{stats['p50']:.1f}", f"{stats['p95']:.1f}",
+                f"{stats['p99']:.1f}", f"{stats['n'] / elapsed:.1f}",
+            ))
+    print(f"size={args.size} concurrency={args.concurrency} cached={args.cached}")
+    print_table(("scenario", "requests", "errors", "p50 ms", "p95 ms", "p99 ms", "req/s"), rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,48 @@
+"""
+Microbenchmarks for parse_pdf, parse_docx, export_pdf and export_docx over
+the synthetic corpus.
+
+Run from backend/:  python -m benchmarks.micro [--runs N]
+"""
+import argparse
+import time
+
+from api.services.exporter import export_docx, export_pdf
+from api.services.parser import parse_docx, parse_pdf
+from benchmarks.common import print_table, summarize
+from benchmarks.corpus import SIZES, build_corpus, read
+
+
+def _measure(func, argument, runs: int) -> list:
+    func(argument)  # warm up imports, fonts and style caches
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func(argument)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    corpus = build_corpus()
+    rows = []
+    for size in SIZES:
+        html = read(corpus[(size, "html")]).decode("utf-8")
+        cases = (
+            ("parse_pdf", parse_pdf, read(corpus[(size, "pdf")])),
+            ("parse_docx", parse_docx, read(corpus[(size, "docx")])),
+            ("export_pdf", export_pdf, html),
+            ("export_docx", export_docx, html),
+        )
+        for name, func, argument in cases:
+            stats = summarize(_measure(func, argument, args.runs))
+            rows.append((name, size, stats["n"], f"{stats['p50']:.1f}", f"{stats['p95']:.1f}", f"{stats['mean']:.1f}"))
+    print_table(("function", "size", "runs", "p50 ms", "p95 ms", "mean ms"), rows)
+
+
+if __name__ == "__main__":
+    main()
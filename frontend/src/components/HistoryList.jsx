@@ -63,9 +63,9 @@ export default function HistoryList({ items, onView, onEdit, onDelete, loading }
                             {(item.matched_keywords || []).slice(0, 5).map((kw, i) => (
                                 <span key={i} className="keyword-chip-mini matched">{kw}</span>
                             ))}
-                            {(item.matched_keywords || []).length > 5 && (
+                            {item.matched_count > 5 && (
                                 <span className="keyword-chip-mini more">
-                                    +{item.matched_keywords.length - 5}
+                                    +{item.matched_count - 5}
                                 </span>
                             )}
                         </div>
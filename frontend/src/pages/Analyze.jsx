@@ -71,10 +71,12 @@ export default function Analyze() {
         try {
             // Use resume_html if available, fallback to resume_text
             const resumeContent = results.resume_html || results.resume_text;
+            // Only the changed nodes come back; the rest is reused from resumeContent
             const { modified_html } = await applyKeywords(
                 resumeContent,
                 selectedKeywords,
-                results.source_type
+                results.source_type,
+                { patch: true }
             );
 
             // Navigate to editor with the modified content
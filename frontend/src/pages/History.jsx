@@ -1,12 +1,15 @@
 import { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import HistoryList from '../components/HistoryList';
-import { getHistory, deleteHistoryItem } from '../services/api';
-import { FiClock } from 'react-icons/fi';
+import { getHistoryPage, getHistoryItem, deleteHistoryItem } from '../services/api';
+import { FiClock, FiAlertCircle } from 'react-icons/fi';
 
 export default function History() {
     const [items, setItems] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
     const [loading, setLoading] = useState(true);
+    const [loadingMore, setLoadingMore] = useState(false);
+    const [error, setError] = useState('');
     const navigate = useNavigate();
 
     useEffect(() => {
@@ -15,8 +18,9 @@ export default function History() {
 
     const loadHistory = async () => {
         try {
-            const data = await getHistory();
-            setItems(data);
+            const page = await getHistoryPage();
+            setItems(page.items);
+            setNextCursor(page.next_cursor);
         } catch (err) {
             console.error('Failed to load history:', err);
         } finally {
@@ -24,41 +28,43 @@ export default function History() {
         }
     };
 
-    const handleView = (item) => {
-        // Navigate to a read-only view or re-show results
-        navigate('/editor', {
-            state: {
-                content: item.final_resume_html || item.resume_html || `<p>${item.resume_text}</p>`,
-                originalResults: {
-                    ats_score: item.ats_score,
-                    matched_keywords: item.matched_keywords,
-                    missing_keywords: item.missing_keywords,
-                    suggestions: item.suggestions,
-                    job_title: item.job_title,
-                    source_type: item.source_type || 'docx',
-                    resume_html: item.resume_html,
-                },
-                appliedKeywords: [],
-            },
-        });
+    const loadMore = async () => {
+        setLoadingMore(true);
+        try {
+            const page = await getHistoryPage(nextCursor);
+            setItems((prev) => [...prev, ...page.items]);
+            setNextCursor(page.next_cursor);
+        } catch (err) {
+            console.error('Failed to load more history:', err);
+        } finally {
+            setLoadingMore(false);
+        }
     };
 
-    const handleEdit = (item) => {
-        navigate('/editor', {
-            state: {
-                content: item.final_resume_html || item.resume_html || `<p>${item.resume_text}</p>`,
-                originalResults: {
-                    ats_score: item.ats_score,
-                    matched_keywords: item.matched_keywords,
-                    missing_keywords: item.missing_keywords,
-                    suggestions: item.suggestions,
-                    job_title: item.job_title,
-                    source_type: item.source_type || 'docx',
-                    resume_html: item.resume_html,
+    // The list only has summaries; fetch the full entry when it is opened
+    const openInEditor = async (summary) => {
+        setError('');
+        try {
+            const item = await getHistoryItem(summary.id);
+            navigate('/editor', {
+                state: {
+                    content: item.final_resume_html || item.resume_html || `<p>${item.resume_text}</p>`,
+                    originalResults: {
+                        ats_score: item.ats_score,
+                        matched_keywords: item.matched_keywords,
+                        missing_keywords: item.missing_keywords,
+                        suggestions: item.suggestions,
+                        job_title: item.job_title,
+                        source_type: item.source_type || 'docx',
+                        resume_html: item.resume_html,
+                    },
+                    appliedKeywords: [],
                 },
-                appliedKeywords: [],
-            },
-        });
+            });
+        } catch (err) {
+            console.error('Failed to open history entry:', err);
+            setError('Could not open this entry: ' + (err.response?.data?.detail || err.message));
+        }
     };
 
     const handleDelete = async (id) => {
@@ -79,13 +85,27 @@ export default function History() {
                 <p>Review and manage your past resume analyses</p>
             </div>
 
+            {error && (
+                <div className="analyze-error">
+                    <FiAlertCircle /> {error}
+                </div>
+            )}
+
             <HistoryList
                 items={items}
                 loading={loading}
-                onView={handleView}
-                onEdit={handleEdit}
+                onView={openInEditor}
+                onEdit={openInEditor}
                 onDelete={handleDelete}
             />
+
+            {nextCursor && !loading && (
+                <div className="history-more">
+                    <button className="btn btn-secondary" onClick={loadMore} disabled={loadingMore}>
+                        {loadingMore ? 'Loading...' : 'Load more'}
+                    </button>
+                </div>
+            )}
         </div>
     );
 }
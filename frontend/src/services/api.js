@@ -27,49 +27,132 @@ export const analyzeResume = async (resumeFile, jobDescription) => {
     return response.data;
 };
 
-export const applyKeywords = async (resumeHtml, keywords, sourceType = 'docx') => {
+const VOID_TAGS = new Set(['br', 'hr', 'img', 'meta', 'link', 'input', 'col', 'wbr', 'source']);
+const TAG_RE = /<!--[\s\S]*?-->|<(\/?)([a-zA-Z][\w-]*)(?:"[^"]*"|'[^']*'|[^'">])*>/g;
+
+// Mirrors split_nodes on the server: cuts the source at each top-level start
+// tag (text before the first one belongs to the first node), so unchanged
+// nodes keep their exact markup and joining the nodes gives back the input.
+const splitNodes = (html) => {
+    const starts = [];
+    let depth = 0;
+    for (const match of html.matchAll(TAG_RE)) {
+        const [markup, closing, name] = match;
+        if (!name) continue;
+        const tag = name.toLowerCase();
+        if (closing) {
+            if (!VOID_TAGS.has(tag)) depth = Math.max(0, depth - 1);
+            continue;
+        }
+        if (depth === 0) starts.push(match.index);
+        if (!VOID_TAGS.has(tag) && !markup.endsWith('/>')) depth += 1;
+    }
+    const bounds = [0, ...starts.slice(1), html.length];
+    const nodes = [];
+    for (let i = 0; i < bounds.length - 1; i += 1) {
+        if (bounds[i + 1] > bounds[i]) nodes.push(html.slice(bounds[i], bounds[i + 1]));
+    }
+    return nodes;
+};
+
+// Same fingerprint as base_hash on the server: first 16 hex digits of SHA-256
+const baseHash = async (html) => {
+    const digest = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(html));
+    return [...new Uint8Array(digest)]
+        .map((byte) => byte.toString(16).padStart(2, '0'))
+        .join('')
+        .slice(0, 16);
+};
+
+// Splices the patch's replacement nodes into resumeHtml; every other node is
+// reused verbatim.
+export const applyHtmlPatch = async (resumeHtml, patch) => {
+    const nodes = splitNodes(resumeHtml);
+    const matches = nodes.length === patch.nodes
+        && (!crypto.subtle || await baseHash(resumeHtml) === patch.base_hash);
+    if (!matches) {
+        throw new Error('Patch does not match this document');
+    }
+    [...patch.operations]
+        .sort((a, b) => b.index - a.index)
+        .forEach((op) => {
+            if (op.op === 'insert') nodes.splice(op.index, 0, op.html);
+            else if (op.op === 'replace') nodes.splice(op.index, op.count, op.html);
+            else nodes.splice(op.index, op.count);
+        });
+    return nodes.join('');
+};
+
+// With { patch: true } only the changed top-level nodes come back; the
+// result still carries modified_html, rebuilt locally from the patch.
+export const applyKeywords = async (resumeHtml, keywords, sourceType = 'docx', { patch = false } = {}) => {
     const response = await api.post('/api/apply-keywords', {
         resume_html: resumeHtml,
         keywords,
         source_type: sourceType
-    });
+    }, { params: patch ? { patch: true } : undefined });
+    if (patch) {
+        return {
+            ...response.data,
+            modified_html: await applyHtmlPatch(resumeHtml, response.data.patch),
+        };
+    }
     return response.data;
 };
 
-export const exportPdf = async (htmlContent, filename = 'resume') => {
-    const response = await api.post('/api/export/pdf', {
+// Last few exports, keyed by format and HTML. Export is a POST, which browsers
+// never revalidate, so the ETag is sent back by hand and a 304 reuses the blob.
+const exportCache = new Map();
+const EXPORT_CACHE_SIZE = 4;
+
+const downloadExport = async (fmt, htmlContent, filename) => {
+    const key = `${fmt}:${htmlContent}`;
+    const cached = exportCache.get(key);
+    const response = await api.post(`/api/export/${fmt}`, {
         html_content: htmlContent,
         filename,
-    }, { responseType: 'blob' });
+    }, {
+        responseType: 'blob',
+        headers: cached ? { 'If-None-Match': cached.etag } : undefined,
+        validateStatus: (status) => (status >= 200 && status < 300) || (status === 304 && !!cached),
+    });
 
-    const url = window.URL.createObjectURL(new Blob([response.data]));
+    let blob = cached?.blob;
+    if (response.status !== 304) {
+        blob = new Blob([response.data]);
+        const etag = response.headers.etag;
+        if (etag) {
+            exportCache.delete(key);
+            exportCache.set(key, { etag, blob });
+            if (exportCache.size > EXPORT_CACHE_SIZE) {
+                exportCache.delete(exportCache.keys().next().value);
+            }
+        }
+    }
+
+    const url = window.URL.createObjectURL(blob);
     const link = document.createElement('a');
     link.href = url;
-    link.download = `${filename}.pdf`;
+    link.download = `${filename}.${fmt}`;
     document.body.appendChild(link);
     link.click();
     link.remove();
     window.URL.revokeObjectURL(url);
 };
 
-export const exportDocx = async (htmlContent, filename = 'resume') => {
-    const response = await api.post('/api/export/docx', {
-        html_content: htmlContent,
-        filename,
-    }, { responseType: 'blob' });
+export const exportPdf = async (htmlContent, filename = 'resume') => {
+    await downloadExport('pdf', htmlContent, filename);
+};
 
-    const url = window.URL.createObjectURL(new Blob([response.data]));
-    const link = document.createElement('a');
-    link.href = url;
-    link.download = `${filename}.docx`;
-    document.body.appendChild(link);
-    link.click();
-    link.remove();
-    window.URL.revokeObjectURL(url);
+export const exportDocx = async (htmlContent, filename = 'resume') => {
+    await downloadExport('docx', htmlContent, filename);
 };
 
-export const getHistory = async () => {
-    const response = await api.get('/api/history');
+// One page of summary rows ({ items, next_cursor }); bodies come from getHistoryItem
+export const getHistoryPage = async (cursor = null, limit = 20) => {
+    const response = await api.get('/api/history/summary', {
+        params: cursor ? { cursor, limit } : { limit },
+    });
     return response.data;
 };
 